@@ -1,5 +1,5 @@
 const CustomerGrowthKPI = require('../models/customerGrowthKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy customer growth data for demonstration
 const generateDummyCustomerGrowthData = () => {
@@ -128,6 +128,8 @@ exports.updateCustomerGrowthKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Customer Growth KPI data updated successfully', customerGrowthKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -144,6 +146,8 @@ exports.deleteCustomerGrowthKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Customer Growth KPI data deleted successfully', customerGrowthKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -342,6 +346,8 @@ exports.selectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -376,6 +382,8 @@ exports.deselectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
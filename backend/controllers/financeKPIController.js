@@ -1,5 +1,5 @@
 const FinanceKPI = require('../models/financeKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy finance data for demonstration
 const generateDummyFinanceData = () => {
@@ -127,6 +127,8 @@ exports.updateFinanceKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Finance KPI data updated successfully', financeKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -143,6 +145,8 @@ exports.deleteFinanceKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Finance KPI data deleted successfully', financeKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -368,6 +372,8 @@ exports.selectKPI = async (req, res) => {
       });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     return res.status(200).json({
       success: true,
       message: 'KPI selected successfully',
@@ -402,6 +408,8 @@ exports.deselectKPI = async (req, res) => {
       });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     return res.status(200).json({
       success: true,
       message: 'KPI deselected successfully',
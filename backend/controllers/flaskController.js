@@ -16,90 +16,6 @@ exports.generateInsights = async (req, res) => {
 
     console.log('Company data:', company);
 
-    // Fetch all KPI data from backend APIs
-    const financeData = await axios.get(`http://localhost:5000/api/finance/kpis/${companyId}`);
-    const salesData = await axios.get(`http://localhost:5000/api/sales/kpis/${companyId}`);
-    const marketingData = await axios.get(`http://localhost:5000/api/marketing/kpis/${companyId}`); 
-    const operationsData = await axios.get(`http://localhost:5000/api/operations/kpis/${companyId}`);
-    const manufacturingData = await axios.get(`http://localhost:5000/api/manufacturing/kpis/${companyId}`);
-    const saasData = await axios.get(`http://localhost:5000/api/saas/kpis/${companyId}`);
-    const productionData = await axios.get(`http://localhost:5000/api/production/kpis/${companyId}`);
-    const customerGrowthData = await axios.get(`http://localhost:5000/api/customer-growth/kpis/${companyId}`);
-
-    // Log the data for debugging
-    // console.log('Finance data:', financeData.data);
-    // console.log('Sales data:', salesData.data);
-    // console.log('Marketing data:', marketingData.data);
-    // console.log('Operations data:', operationsData.data);
-    // console.log('Manufacturing data:', manufacturingData.data);
-    // console.log('SaaS data:', saasData.data);
-    // console.log('Production data:', productionData.data);
-    // console.log('Customer Growth data:', customerGrowthData.data);
-
-    // Process the data for each department
-    const processKPIs = (data, departmentName) => {
-      if (!data || !data.kpis) {
-        console.log(`No valid data for ${departmentName}`);
-        return [];
-      }
-      
-      const result = [];
-      const selectedKPIs = data.selectedKPIs || [];
-      
-      // For each KPI key in the kpis object
-      Object.keys(data.kpis).forEach(kpiName => {
-        // If it's in the selected KPIs, add it to our result
-        if (selectedKPIs.includes(kpiName)) {
-          const kpiData = data.kpis[kpiName];
-          
-          // Ensure kpiData is an array before trying to iterate
-          if (Array.isArray(kpiData)) {
-            kpiData.forEach(dataPoint => {
-              // Add the processed data point with department information
-              result.push({
-                ...dataPoint,
-                kpiName,
-                department: departmentName
-              });
-            });
-          }
-        }
-      });
-      
-      return result;
-    };
-
-    // Process data for each department
-    const financeKPIData = processKPIs(financeData.data, 'Finance');
-    const salesKPIData = processKPIs(salesData.data, 'Sales');
-    const marketingKPIData = processKPIs(marketingData.data, 'Marketing');
-    const operationsKPIData = processKPIs(operationsData.data, 'Operations');
-    const manufacturingKPIData = processKPIs(manufacturingData.data, 'Manufacturing');
-    const saasKPIData = processKPIs(saasData.data, 'SaaS');
-    const productionKPIData = processKPIs(productionData.data, 'Production');
-    const customerGrowthKPIData = processKPIs(customerGrowthData.data, 'Customer Growth');
-
-    // Combine all KPI data into a single array
-    const allKPIData = [
-      ...financeKPIData,
-      ...salesKPIData,
-      ...marketingKPIData,
-      ...operationsKPIData,
-      ...manufacturingKPIData,
-      ...saasKPIData,
-      ...productionKPIData,
-      ...customerGrowthKPIData
-    ];
-
-    // Convert allKPIData array to an object: { kpiName: value, ... }
-    const kpiDataObject = {};
-    allKPIData.forEach(kpi => {
-      // Use the latest value for each KPI name
-      if (kpi.kpiName && kpi.value !== undefined) {
-        kpiDataObject[kpi.kpiName] = kpi.value;
-      }
-    });
-
     // Prepare data to send to the Flask API
     const requestData = {
       company_data: {
@@ -117,7 +33,8 @@ exports.generateInsights = async (req, res) => {
         marketCGAR: company.marketCAGR,
         elevator_pitch: company.elevatorPitch,
       },
-      kpi_data: kpiDataObject, // send as object, not array
+      // Flask collects every department's KPIs for this company in parallel
+      company_id: companyId,
     };
 
     console.log('Request data to Flask API:', requestData);
@@ -1,5 +1,5 @@
 const ManufacturingKPI = require('../models/manufacturingKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy manufacturing data for demonstration
 const generateDummyManufacturingData = () => {
@@ -127,6 +127,8 @@ exports.updateManufacturingKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Manufacturing KPI data updated successfully', manufacturingKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -143,6 +145,8 @@ exports.deleteManufacturingKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Manufacturing KPI data deleted successfully', manufacturingKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -343,6 +347,8 @@ exports.selectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -376,6 +382,8 @@ exports.deselectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
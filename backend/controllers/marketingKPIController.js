@@ -1,5 +1,5 @@
 const MarketingKPI = require('../models/marketingKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy marketing data for demonstration
 const generateDummyMarketingData = () => {
@@ -127,6 +127,8 @@ exports.updateMarketingKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Marketing KPI data updated successfully', marketingKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -143,6 +145,8 @@ exports.deleteMarketingKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Marketing KPI data deleted successfully', marketingKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -345,6 +349,8 @@ exports.selectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -379,6 +385,8 @@ exports.deselectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -1,5 +1,5 @@
 const OperationsKPI = require('../models/operationsKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy operations data for demonstration
 const generateDummyOperationsData = () => {
@@ -127,6 +127,8 @@ exports.updateOperationsKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Operations KPI data updated successfully', operationsKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -143,6 +145,8 @@ exports.deleteOperationsKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Operations KPI data deleted successfully', operationsKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -341,6 +345,8 @@ exports.selectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -375,6 +381,8 @@ exports.deselectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -1,5 +1,5 @@
 const ProductionKPI = require('../models/productionKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy production data for demonstration
 const generateDummyProductionData = () => {
@@ -127,6 +127,8 @@ exports.updateProductionKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Production KPI data updated successfully', productionKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -143,6 +145,8 @@ exports.deleteProductionKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Production KPI data deleted successfully', productionKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -345,6 +349,8 @@ exports.selectKPI = async (req, res) => {
       });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     return res.status(200).json({
       success: true,
       message: 'KPI selected successfully',
@@ -378,6 +384,8 @@ exports.deselectKPI = async (req, res) => {
       });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     return res.status(200).json({
       success: true,
       message: 'KPI deselected successfully',
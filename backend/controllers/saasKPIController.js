@@ -1,5 +1,5 @@
 const SaasKPI = require('../models/saasKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy SaaS data for demonstration
 const generateDummySaasData = () => {
@@ -129,6 +129,8 @@ exports.updateSaaSKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'SaaS KPI data updated successfully', saasKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -145,6 +147,8 @@ exports.deleteSaaSKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'SaaS KPI data deleted successfully', saasKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -344,6 +348,8 @@ exports.selectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -378,6 +384,8 @@ exports.deselectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
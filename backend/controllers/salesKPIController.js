@@ -1,5 +1,5 @@
 const SalesKPI = require('../models/salesKPIModel');
-const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData } = require('../services/commonServices');
+const { parseCSVFile, parseInlineCSV, transformRow, saveKPIData, invalidateKPISnapshot } = require('../services/commonServices');
 
 // Generate dummy sales data for demonstration
 const generateDummySalesData = () => {
@@ -116,6 +116,8 @@ exports.updateSalesKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Sales KPI data updated successfully', salesKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -132,6 +134,8 @@ exports.deleteSalesKPI = async (req, res) => {
       return res.status(404).json({ message: 'Company not found' });
     }
 
+    await invalidateKPISnapshot(companyId);
+
     res.status(200).json({ message: 'Sales KPI data deleted successfully', salesKpi });
   } catch (error) {
     res.status(500).json({ message: error.message });
@@ -335,6 +339,8 @@ exports.selectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -369,6 +375,8 @@ exports.deselectKPI = async (req, res) => {
         message: 'Company not found'
       });
     }
+
+    await invalidateKPISnapshot(companyId);
     
     return res.status(200).json({
       success: true,
@@ -1,6 +1,7 @@
 const fs = require('fs');
 const path = require('path');
 const csv = require('csv-parser');
+const axios = require('axios');
 /*
 * Parses CSV file from a file path
 * @param {string} filePath
@@ -62,6 +63,19 @@ const transformRow = (row) => {
  return { date, metrics };
 };
 
+/**
+* Drop the Flask service's cached KPI snapshot for a company so the next
+* insights request sees the new data. Failures are logged, not thrown.
+* @param {string} companyId
+*/
+const invalidateKPISnapshot = async (companyId) => {
+ try {
+   await axios.delete(`http://localhost:5001/kpi-snapshot/${companyId}`);
+ } catch (error) {
+   console.error('Error invalidating KPI snapshot:', error.message);
+ }
+};
+
 /**
 * Save parsed KPI data
 */
@@ -82,7 +96,9 @@ const saveKPIData = async (Model, companyId, records, department) => {
    existingDoc.selectedKPIs = [...allKPIKeys];
    existingDoc.data = formattedData;
    existingDoc.department = department;
-   return await existingDoc.save();
+   const savedDoc = await existingDoc.save();
+   await invalidateKPISnapshot(companyId);
+   return savedDoc;
  }
 
  const newDoc = new Model({
@@ -93,12 +109,15 @@ const saveKPIData = async (Model, companyId, records, department) => {
    data: formattedData
  });
 
- return await newDoc.save();
+ const savedDoc = await newDoc.save();
+ await invalidateKPISnapshot(companyId);
+ return savedDoc;
 };
 
 module.exports = {
  parseCSVFile,
  parseInlineCSV,
  transformRow,
- saveKPIData
+ saveKPIData,
+ invalidateKPISnapshot
 };
\ No newline at end of file
@@ -0,0 +1,86 @@
+# Startup-time benchmark for the Flask insights service
+# Compares the cold-start cost of a worker that sets itself up from scratch with a
+# worker forked from a master that already loaded the app (gunicorn preload_app).
+#
+# Usage: python bench_startup.py [--workers 4]
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Child snippet for the "fresh" mode: import the app, load the model client the way a
+# worker's first real request would, and serve one request
+FRESH_WORKER = """
+import time
+start = time.perf_counter()
+import flask_backend
+flask_backend.agent.preload()
+client = flask_backend.app.test_client()
+client.post('/generate-insights', json={})
+print(time.perf_counter() - start)
+"""
+
+
+def bench_fresh(workers: int) -> list:
+    """Start each worker as a new interpreter that imports and sets up everything itself."""
+    timings = []
+    for _ in range(workers):
+        output = subprocess.run(
+            [sys.executable, "-c", FRESH_WORKER],
+            cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def bench_preload(workers: int) -> tuple:
+    """Import the app once, then fork workers that inherit the loaded state."""
+    start = time.perf_counter()
+    import flask_backend
+    flask_backend.agent.preload()
+    master_setup = time.perf_counter() - start
+
+    timings = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        fork_start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            client = flask_backend.app.test_client()
+            client.post('/generate-insights', json={})
+            os.write(write_fd, str(time.perf_counter() - fork_start).encode())
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            timings.append(float(pipe.read()))
+        os.waitpid(pid, 0)
+    return master_setup, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-worker cold-start cost")
+    parser.add_argument("--workers", type=int, default=4, help="Number of workers to start")
+    args = parser.parse_args()
+
+    # The benchmark never reaches Gemini, so any key will do
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    sys.path.insert(0, HERE)
+
+    fresh = bench_fresh(args.workers)
+    master_setup, preload = bench_preload(args.workers)
+
+    print(f"Workers: {args.workers}")
+    print(f"Fresh workers:   {sum(fresh) / len(fresh) * 1000:8.1f} ms per worker "
+          f"({sum(fresh) * 1000:.1f} ms total)")
+    print(f"Preload master:  {master_setup * 1000:8.1f} ms once")
+    print(f"Forked workers:  {sum(preload) / len(preload) * 1000:8.1f} ms per worker "
+          f"({(master_setup + sum(preload)) * 1000:.1f} ms total incl. master)")
+
+
+if __name__ == '__main__':
+    main()
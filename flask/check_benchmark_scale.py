@@ -0,0 +1,43 @@
+# Benchmark comparison check for the rules-based insights engine
+# Runs the engine on KPI values and benchmarks whose outcome is known, including
+# percentage benchmarks parsed from search snippets, and fails if any comes out wrong.
+#
+# Usage: python check_benchmark_scale.py
+
+import sys
+
+from local_insights import LocalInsightsEngine
+from main_new_1 import IndustryBenchmarkFetcher
+
+CHURN = "The industry average customer churn rate is 7%."
+CONVERSION = "The industry average conversion rate is 2%."
+
+# (kpi, search term, value, snippet, expected status)
+CASES = [
+    # Rates are recorded as 5 for 5%, snippets give "7%"
+    ("customerChurnRate", "customer churn rate", 5, CHURN, "better"),
+    ("customerChurnRate", "customer churn rate", 12, CHURN, "worse"),
+    ("conversionRate", "conversion rate", 3, CONVERSION, "better"),
+    ("conversionRate", "conversion rate", 1, CONVERSION, "worse"),
+    # Fractions compared with fractions stay as they are
+    ("conversionRate", "conversion rate", 0.03, CONVERSION, "better"),
+]
+
+
+def main():
+    fetcher = IndustryBenchmarkFetcher()
+    engine = LocalInsightsEngine()
+    failures = []
+    for kpi, term, value, snippet, expected in CASES:
+        bench = fetcher._extract_benchmark_values(snippet, term)
+        assessment = engine.assess_kpis({kpi: value}, {kpi: bench})[0]
+        status = "ok" if assessment["status"] == expected else "FAIL"
+        print(f"{status:<4} {kpi}={value} vs {snippet!r}: {assessment['status']} "
+              f"(benchmark {assessment['benchmark']}, expected {expected})")
+        if status == "FAIL":
+            failures.append(kpi)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Import-time profile check for the Flask insights service
+# Starts a fresh interpreter, imports the app and serves one /health request, then
+# fails if that took longer than the tracked budget or pulled in a heavy dependency.
+#
+# Usage: python check_import_budget.py [--budget-ms 500] [--profile]
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Time-to-first-request budget in milliseconds. Raise it deliberately, not silently.
+TIME_TO_FIRST_REQUEST_BUDGET_MS = 500
+
+# Modules that must not be imported to answer a health check
+HEAVY_MODULES = ["google.generativeai", "feedparser", "bs4", "requests"]
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import flask_backend
+response = flask_backend.app.test_client().get('/health')
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    "elapsed_ms": elapsed_ms,
+    "status": response.status_code,
+    "heavy_loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_probe(profile: bool = False) -> dict:
+    """Run the probe in a new interpreter and return its measurements."""
+    command = [sys.executable]
+    if profile:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE]
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_API_KEY", "import-budget-key")
+    result = subprocess.run(command, cwd=HERE, env=env, capture_output=True, text=True, check=True)
+    measurements = json.loads(result.stdout.strip().splitlines()[-1])
+    if profile:
+        measurements["importtime"] = result.stderr
+    return measurements
+
+
+def slowest_imports(importtime_output: str, count: int = 10) -> list:
+    """Return the ``count`` slowest imports (cumulative microseconds, module) from -X importtime output."""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the service's time-to-first-request budget")
+    parser.add_argument("--budget-ms", type=float, default=TIME_TO_FIRST_REQUEST_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="Probe runs; the fastest one is compared")
+    parser.add_argument("--profile", action="store_true", help="Print the slowest imports")
+    args = parser.parse_args()
+
+    # Use the fastest run so one noisy start does not fail the check
+    runs = [run_probe() for _ in range(args.runs)]
+    best = min(runs, key=lambda run: run["elapsed_ms"])
+
+    print(f"Time to first request: {best['elapsed_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    failures = []
+    if best["status"] != 200:
+        failures.append(f"/health returned {best['status']}")
+    if best["elapsed_ms"] > args.budget_ms:
+        failures.append("time to first request is over budget")
+    if best["heavy_loaded"]:
+        failures.append(f"heavy modules imported eagerly: {', '.join(best['heavy_loaded'])}")
+
+    if args.profile or failures:
+        print("Slowest imports (cumulative):")
+        for cumulative, module in slowest_imports(run_probe(profile=True)["importtime"]):
+            print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
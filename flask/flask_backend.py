@@ -1,10 +1,23 @@
+import os
 from flask import Flask, request, jsonify
 from main_new_1 import StartupKPIAgent
+from kpi_aggregation import KPIAggregator, create_kpi_source
 
 app = Flask(__name__)
 
 # Initialize the KPI Agent
+# Heavy dependencies load on first use. A pre-forking server (see gunicorn.conf.py) sets
+# KPI_PRELOAD so the model setup happens once in the master and every worker inherits it.
 agent = StartupKPIAgent()
+if os.getenv("KPI_PRELOAD") == "1":
+    agent.preload()
+
+# Collects every department's KPIs for a company in parallel (source set by KPI_SOURCE)
+kpi_aggregator = KPIAggregator(create_kpi_source(), agent.state_store)
+
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({'status': 'ok'}), 200
 
 @app.route('/generate-insights', methods=['POST'])
 def generate_insights():
@@ -13,18 +26,64 @@ def generate_insights():
         data = request.get_json()
         company_data = data.get('company_data', {})
         kpi_data = data.get('kpi_data', {})
+        kpi_series = None
+        # "preview" returns the rules-based analysis without calling Gemini
+        mode = data.get('mode') or request.args.get('mode', 'full')
+
+        # Callers may send a company_id instead of kpi_data to have the KPIs aggregated here
+        company_id = data.get('company_id')
+        if company_id and not kpi_data:
+            frame = kpi_aggregator.snapshot(company_id)
+            kpi_data, kpi_series = frame.latest(), frame.series()
 
         # Validate input
         if not company_data or not kpi_data:
             return jsonify({'error': 'Missing company_data or kpi_data in request'}), 400
 
         # Generate insights using the AI agent
-        insights = agent.generate_startup_insights(company_data, kpi_data)
+        insights = agent.generate_startup_insights(company_data, kpi_data, mode=mode, kpi_series=kpi_series)
         insights = agent.render_insights_with_hyperlinks(insights)
-        agent.save_insights(company_data.get('name', 'company'), insights)
+        if mode != 'preview':
+            agent.save_insights(company_data.get('name', 'company'), insights)
         return jsonify(insights), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/prefetch-context', methods=['POST'])
+def prefetch_context():
+    try:
+        data = request.get_json()
+        company_data = data.get('company_data', {})
+        if not company_data:
+            return jsonify({'error': 'Missing company_data in request'}), 400
+
+        # Warm the caches at low priority so a later /generate-insights call is fast
+        cached = agent.prefetch_context(company_data, list(data.get('kpi_data', {}).keys()))
+        return jsonify({'cached': cached, 'scheduler': agent.scheduler.stats()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/kpi-snapshot/<company_id>', methods=['GET'])
+def kpi_snapshot(company_id):
+    try:
+        frame = kpi_aggregator.snapshot(company_id, refresh=request.args.get('refresh') == '1')
+        return jsonify({
+            'company_id': company_id,
+            'departments': frame.departments(),
+            'latest': frame.latest(),
+            'frame': frame.to_dict(),
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/kpi-snapshot/<company_id>', methods=['DELETE'])
+def invalidate_kpi_snapshot(company_id):
+    try:
+        # Called by the Node backend after a KPI upload
+        kpi_aggregator.invalidate(company_id)
+        return jsonify({'invalidated': company_id}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)  # Run the Flask app on port 5001
\ No newline at end of file
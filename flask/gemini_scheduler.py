@@ -0,0 +1,214 @@
+# Priority-aware scheduling of Gemini requests
+# Every model call goes through the scheduler, which splits the daily quota into reserved
+# slices per priority class, caps how many calls run per minute and at once, and queues
+# callers in priority order, shedding those that cannot be served before their deadline.
+
+import time
+import math
+import threading
+from enum import IntEnum
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class Priority(IntEnum):
+    """Priority classes, most important first."""
+    INTERACTIVE = 0  # A user is waiting on the result (SWOT analysis)
+    BATCH = 1        # Supporting or background work (competitor info)
+    PREFETCH = 2     # Cache warming that nobody is waiting on yet
+
+
+# Share of the daily quota reserved for each class. A class may also use the unused
+# reserve of less important classes, never that of more important ones.
+DEFAULT_QUOTA_SHARES = {
+    Priority.INTERACTIVE: 0.6,
+    Priority.BATCH: 0.25,
+    Priority.PREFETCH: 0.15,
+}
+
+
+class GeminiQuotaExceeded(Exception):
+    """Raised when the daily Gemini request limit has been reached."""
+
+
+class RequestShed(Exception):
+    """Raised when a queued request cannot be started before its deadline."""
+
+
+class _Ticket:
+    __slots__ = ("priority", "deadline", "seq")
+
+    def __init__(self, priority: Priority, deadline: Optional[float], seq: int):
+        self.priority = priority
+        self.deadline = deadline
+        self.seq = seq
+
+    def sort_key(self):
+        # Priority first, then earliest deadline, then arrival order
+        return (self.priority, self.deadline if self.deadline is not None else math.inf, self.seq)
+
+
+class GeminiScheduler:
+    """
+    Admission control in front of the Gemini model client.
+
+    Quota counters live in the state store, so the reserved slices hold across all workers.
+    The per-minute and concurrency caps apply per process.
+    """
+
+    def __init__(self, state_store, daily_limit: int, quota_shares: Optional[Dict[Priority, float]] = None,
+                 max_concurrent: int = 4, max_per_minute: int = 15):
+        """
+        Initialize the scheduler.
+
+        Args:
+            state_store: Store holding the daily quota counters (see state_store.py)
+            daily_limit (int): Total Gemini requests allowed per day
+            quota_shares (Dict, optional): Share of the daily limit reserved for each priority
+            max_concurrent (int): Maximum number of calls running at the same time
+            max_per_minute (int): Maximum number of calls started in any 60-second window
+        """
+        self.state_store = state_store
+        self.daily_limit = daily_limit
+        self.quota_shares = quota_shares or DEFAULT_QUOTA_SHARES
+        self.max_concurrent = max_concurrent
+        self.max_per_minute = max_per_minute
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = 0
+        self._in_flight = 0
+        self._recent_starts = deque()
+
+    def quota_slices(self) -> Dict[Priority, int]:
+        """Number of daily requests reserved for each priority class."""
+        slices = {p: int(self.daily_limit * self.quota_shares.get(p, 0)) for p in Priority}
+        # Rounding leftovers go to interactive requests
+        slices[Priority.INTERACTIVE] += self.daily_limit - sum(slices.values())
+        return slices
+
+    def _counter_name(self, priority: Priority) -> str:
+        return f"gemini:{priority.name.lower()}"
+
+    def remaining(self, priority: Priority = Priority.INTERACTIVE) -> int:
+        """Requests still available today to a class, including borrowable lower-class reserve."""
+        slices = self.quota_slices()
+        return sum(
+            max(slices[p] - self.state_store.get_counter(self._counter_name(p)), 0)
+            for p in Priority if p >= priority
+        )
+
+    def _consume_quota(self, priority: Priority) -> bool:
+        slices = self.quota_slices()
+        # Own reserve first, then borrow from less important classes
+        for p in sorted(p for p in Priority if p >= priority):
+            if self.state_store.increment_counter(self._counter_name(p), slices[p]):
+                return True
+        return False
+
+    def _prune_window(self, now: float) -> None:
+        while self._recent_starts and self._recent_starts[0] <= now - 60:
+            self._recent_starts.popleft()
+
+    def _estimated_wait(self, position: int, now: float) -> float:
+        """Seconds until the request at ``position`` in the queue could start under the per-minute cap."""
+        free_slots = self.max_per_minute - len(self._recent_starts)
+        if position < free_slots:
+            return 0.0
+        # Each start ahead of us past the free slots waits for an older start to leave the window
+        index = position - free_slots
+        if index < len(self._recent_starts):
+            return self._recent_starts[index] + 60 - now
+        return 60.0 * (index // self.max_per_minute + 1)
+
+    def _can_start(self, ticket: _Ticket) -> bool:
+        return (self._queue[0] is ticket and
+                self._in_flight < self.max_concurrent and
+                len(self._recent_starts) < self.max_per_minute)
+
+    def submit(self, fn: Callable[[], Any], priority: Priority = Priority.INTERACTIVE,
+               timeout: Optional[float] = None) -> Any:
+        """
+        Run ``fn`` once the scheduler admits it.
+
+        Args:
+            fn (Callable): The model call to make
+            priority (Priority): Priority class of the request
+            timeout (float, optional): Seconds the caller is willing to wait in the queue
+
+        Returns:
+            The result of ``fn``
+
+        Raises:
+            GeminiQuotaExceeded: If no quota is left for this priority class today
+            RequestShed: If the request cannot be started before its deadline
+        """
+        if self.remaining(priority) <= 0:
+            raise GeminiQuotaExceeded(
+                f"Gemini API daily request limit ({self.daily_limit}) reached for "
+                f"{priority.name.lower()} requests. Please try again tomorrow."
+            )
+
+        now = time.monotonic()
+        deadline = now + timeout if timeout is not None else None
+
+        with self._cond:
+            self._seq += 1
+            ticket = _Ticket(priority, deadline, self._seq)
+            self._queue.append(ticket)
+            self._queue.sort(key=_Ticket.sort_key)
+
+            # Shed right away if the queue ahead of us cannot drain in time
+            self._prune_window(now)
+            if deadline is not None and now + self._estimated_wait(self._queue.index(ticket), now) > deadline:
+                self._queue.remove(ticket)
+                raise RequestShed(f"{priority.name.lower()} request shed: queue cannot drain before its deadline")
+
+            while True:
+                now = time.monotonic()
+                self._prune_window(now)
+                if self._can_start(ticket):
+                    break
+                if deadline is not None and now >= deadline:
+                    self._queue.remove(ticket)
+                    self._cond.notify_all()
+                    raise RequestShed(f"{priority.name.lower()} request shed: deadline passed while queued")
+
+                # Wake up when a window slot frees, the deadline passes, or another call finishes
+                wait = None
+                if len(self._recent_starts) >= self.max_per_minute:
+                    wait = self._recent_starts[0] + 60 - now
+                if deadline is not None:
+                    wait = min(wait, deadline - now) if wait is not None else deadline - now
+                self._cond.wait(wait)
+
+            self._queue.remove(ticket)
+            self._in_flight += 1
+            self._recent_starts.append(now)
+            self._cond.notify_all()
+
+        try:
+            if not self._consume_quota(priority):
+                raise GeminiQuotaExceeded(
+                    f"Gemini API daily request limit ({self.daily_limit}) reached for "
+                    f"{priority.name.lower()} requests. Please try again tomorrow."
+                )
+            return fn()
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth, running calls and remaining quota per class."""
+        with self._cond:
+            self._prune_window(time.monotonic())
+            queued = {p.name.lower(): sum(1 for t in self._queue if t.priority == p) for p in Priority}
+            in_flight = self._in_flight
+            started_last_minute = len(self._recent_starts)
+        return {
+            "queued": queued,
+            "in_flight": in_flight,
+            "started_last_minute": started_last_minute,
+            "remaining_quota": {p.name.lower(): self.remaining(p) for p in Priority},
+        }
@@ -0,0 +1,27 @@
+# Gunicorn configuration for the multi-process deployment mode
+# Usage: gunicorn -c gunicorn.conf.py flask_backend:app
+#
+# The app (and with it the Gemini model client) is loaded once in the master process
+# before workers are forked. Caches and the daily Gemini quota are kept in a SQLite
+# state store so every worker sees the same data.
+
+import os
+import multiprocessing
+
+bind = os.getenv("KPI_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("KPI_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = "gthread"
+threads = int(os.getenv("KPI_THREADS", 4))
+
+# Insight generation scrapes the web and calls Gemini, which can take a while
+timeout = int(os.getenv("KPI_TIMEOUT", 180))
+
+# Do the heavy setup once before forking
+preload_app = True
+os.environ.setdefault("KPI_PRELOAD", "1")
+
+# Share caches and quota across workers unless a backend was chosen explicitly
+os.environ.setdefault(
+    "KPI_STATE_BACKEND",
+    "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "kpi_state.db")
+)
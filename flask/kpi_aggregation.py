@@ -0,0 +1,326 @@
+# Cross-department KPI aggregation
+# Collects every department's KPI series for a company in one round of parallel requests,
+# normalizes them into a single columnar frame and caches the result per company, so
+# building the input for an insights request no longer takes eight sequential round-trips.
+
+import os
+import csv
+import uuid
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from singleflight import SingleFlight
+from lazy_imports import LazyModule
+
+requests = LazyModule("requests")
+pymongo = LazyModule("pymongo")  # Optional, only needed by MongoKPISource
+
+# One entry per department, in the order the Node backend used to merge them. When two
+# departments report the same KPI for the same month, the later one wins.
+Department = namedtuple("Department", ["name", "api_path", "collection", "csv_name"])
+DEPARTMENTS = [
+    Department("Finance", "finance", "financekpis", "Finance"),
+    Department("Sales", "sales", "saleskpis", "Sales"),
+    Department("Marketing", "marketing", "marketingkpis", "Marketing"),
+    Department("Operations", "operations", "operationskpis", "Operations"),
+    Department("Manufacturing", "manufacturing", "manufacturingkpis", "Manufacturing"),
+    Department("SaaS", "saas", "saaskpis", "SaaS"),
+    Department("Production", "production", "productionkpis", "Production"),
+    Department("Customer Growth", "customer-growth", "customergrowthkpis", "Customer_Growth"),
+]
+
+DEFAULT_KPI_API_URL = "http://localhost:5000/api"
+SAMPLE_CSV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "sample-KPI-csv")
+SNAPSHOT_CACHE_TTL = 3600  # Uploads invalidate snapshots; the TTL only bounds staleness from other edits
+SOURCE_TIMEOUT = 10  # Seconds per department request
+
+# (kpi, month, value) rows as returned by a source for one department
+KPIRows = List[Tuple[str, str, float]]
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_month(value: Any) -> str:
+    """Normalize a date (datetime, ISO string or YYYY-MM) to YYYY-MM, as the dashboards use."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m")
+    return str(value)[:7]
+
+
+class KPIFrame:
+    """
+    Columnar table of KPI observations with one row per (department, kpi, month).
+
+    Kept to plain lists rather than a DataFrame so that aggregation does not pull pandas
+    into the service's cold start.
+    """
+
+    COLUMNS = ("department", "kpi", "date", "value")
+
+    def __init__(self, department: List[str] = None, kpi: List[str] = None,
+                 date: List[str] = None, value: List[float] = None):
+        self.department = department or []
+        self.kpi = kpi or []
+        self.date = date or []
+        self.value = value or []
+
+    def __len__(self):
+        return len(self.value)
+
+    def append(self, department: str, rows: KPIRows):
+        """Add one department's rows, ordered by month."""
+        for kpi, date, value in sorted(rows, key=lambda row: (row[0], row[1])):
+            self.department.append(department)
+            self.kpi.append(kpi)
+            self.date.append(date)
+            self.value.append(value)
+
+    def departments(self) -> List[str]:
+        """Departments that contributed at least one row, in order."""
+        return list(dict.fromkeys(self.department))
+
+    def _owners(self) -> Dict[str, str]:
+        # For each KPI, the department holding its most recent value
+        latest_date, owners = {}, {}
+        for department, kpi, date in zip(self.department, self.kpi, self.date):
+            if kpi not in latest_date or date >= latest_date[kpi]:
+                latest_date[kpi] = date
+                owners[kpi] = department
+        return owners
+
+    def latest(self) -> Dict[str, float]:
+        """Most recent value of each KPI, the ``kpi_data`` format the insights endpoint expects."""
+        return {kpi: values[-1] for kpi, values in self.series().items()}
+
+    def series(self) -> Dict[str, List[float]]:
+        """Values of each KPI oldest first, taken from the department reporting it most recently."""
+        owners = self._owners()
+        series = {}
+        for department, kpi, value in zip(self.department, self.kpi, self.value):
+            if owners[kpi] == department:
+                series.setdefault(kpi, []).append(value)
+        return series
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """JSON-serializable columns, used for caching and API responses."""
+        return {column: getattr(self, column) for column in self.COLUMNS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[Any]]) -> "KPIFrame":
+        return cls(**{column: list(data.get(column, [])) for column in cls.COLUMNS})
+
+
+class HTTPKPISource:
+    """Reads KPIs through the Node backend's department endpoints (``/api/<dept>/kpis/<id>``)."""
+
+    def __init__(self, base_url: str = DEFAULT_KPI_API_URL, timeout: float = SOURCE_TIMEOUT):
+        """
+        Args:
+            base_url (str): Base URL of the Node API, e.g. http://localhost:5000/api
+            timeout (float): Seconds to wait for each department
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def fetch(self, company_id: str, department: Department) -> KPIRows:
+        response = requests.get(f"{self.base_url}/{department.api_path}/kpis/{company_id}", timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json() or {}
+        selected = set(data.get("selectedKPIs") or [])
+        rows = []
+        for kpi, points in (data.get("kpis") or {}).items():
+            if kpi not in selected or not isinstance(points, list):
+                continue
+            for point in points:
+                value = _to_float(point.get("value"))
+                if value is not None and point.get("month"):
+                    rows.append((kpi, _to_month(point["month"]), value))
+        return rows
+
+
+class MongoKPISource:
+    """Reads KPI documents straight from the backend's MongoDB collections (requires pymongo)."""
+
+    def __init__(self, uri: str, database: Optional[str] = None):
+        """
+        Args:
+            uri (str): MongoDB connection string, e.g. the backend's MONGO_URI
+            database (str, optional): Database name if the URI does not include one
+        """
+        self.uri = uri
+        self.database = database or os.getenv("MONGO_DB", "test")  # mongoose's default database
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    client = pymongo.MongoClient(self.uri)
+                    self._db = client.get_default_database(default=self.database)
+        return self._db
+
+    def fetch(self, company_id: str, department: Department) -> KPIRows:
+        document = self.db[department.collection].find_one(
+            {"companyId": company_id}, {"selectedKPIs": 1, "data": 1}
+        )
+        if not document:
+            return []
+        selected = set(document.get("selectedKPIs") or [])
+        rows = []
+        for entry in document.get("data") or []:
+            if not entry.get("date"):
+                continue
+            month = _to_month(entry["date"])
+            for kpi, raw in (entry.get("metrics") or {}).items():
+                value = _to_float(raw)
+                if kpi in selected and value is not None:
+                    rows.append((kpi, month, value))
+        return rows
+
+
+class CSVKPISource:
+    """
+    Reads KPIs from per-department CSV files (a ``Date`` column plus one column per KPI).
+
+    The same files are used for every company, which makes this source handy for local
+    development and load tests without the Node backend or MongoDB.
+    """
+
+    def __init__(self, directory: str = SAMPLE_CSV_DIR, filename: str = "Dhruvaa_KPI_{department}.csv"):
+        """
+        Args:
+            directory (str): Folder holding the CSV files
+            filename (str): File name template, formatted with the department's CSV name
+        """
+        self.directory = directory
+        self.filename = filename
+
+    def fetch(self, company_id: str, department: Department) -> KPIRows:
+        path = os.path.join(self.directory, self.filename.format(department=department.csv_name))
+        if not os.path.exists(path):
+            return []
+        rows = []
+        with open(path, newline="") as f:
+            for record in csv.DictReader(f):
+                date = record.pop("Date", None)
+                if not date:
+                    continue
+                for kpi, raw in record.items():
+                    value = _to_float(raw)
+                    if value is not None:
+                        rows.append((kpi, _to_month(date), value))
+        return rows
+
+
+def create_kpi_source(spec: Optional[str] = None):
+    """
+    Create a KPI source from a spec.
+
+    Args:
+        spec (str, optional): ``"http://host:port/api"``, ``"mongodb://..."``, ``"csv"`` or
+                              ``"csv:///path/to/dir"``. Defaults to the KPI_SOURCE environment
+                              variable, then the local Node API.
+
+    Returns:
+        HTTPKPISource, MongoKPISource or CSVKPISource
+    """
+    spec = spec or os.getenv("KPI_SOURCE", DEFAULT_KPI_API_URL)
+    if spec.startswith(("http://", "https://")):
+        return HTTPKPISource(spec)
+    if spec.startswith(("mongodb://", "mongodb+srv://")):
+        return MongoKPISource(spec)
+    if spec == "csv":
+        return CSVKPISource()
+    if spec.startswith("csv:///"):
+        return CSVKPISource(spec[len("csv://"):])
+    raise ValueError(f"Unknown KPI source: {spec}")
+
+
+class KPIAggregator:
+    """
+    Builds and caches per-company KPI snapshots from all departments.
+
+    Snapshots are stored in the shared state store, so every worker reuses them until an
+    upload invalidates the company's snapshot or the TTL passes.
+    """
+
+    def __init__(self, source, state_store, ttl: float = SNAPSHOT_CACHE_TTL,
+                 departments: List[Department] = None):
+        """
+        Args:
+            source: Where KPIs are read from (see create_kpi_source)
+            state_store: Store holding the cached snapshots (see state_store.py)
+            ttl (float): Seconds a snapshot is kept without an invalidation
+            departments (List[Department], optional): Departments to collect, defaults to all
+        """
+        self.source = source
+        self.state_store = state_store
+        self.ttl = ttl
+        self.departments = departments or DEPARTMENTS
+        self._pool = ThreadPoolExecutor(max_workers=len(self.departments), thread_name_prefix="kpi-source")
+        self._flights = SingleFlight()
+
+    def snapshot(self, company_id: str, refresh: bool = False) -> KPIFrame:
+        """
+        All departments' KPI series for a company.
+
+        Args:
+            company_id (str): Company to aggregate
+            refresh (bool): Ignore the cached snapshot and read the source again
+
+        Returns:
+            KPIFrame with the company's KPI observations
+        """
+        if not refresh:
+            cached = self.state_store.get("kpi_snapshots", company_id)
+            if cached is not None:
+                return KPIFrame.from_dict(cached)
+        # Requests after an upload never join a build that started before it
+        generation = self._generation(company_id)
+        return self._flights.do((company_id, generation), self._build_snapshot, company_id, generation)
+
+    def _generation(self, company_id: str) -> str:
+        return self.state_store.get("kpi_generations", company_id) or ""
+
+    def _build_snapshot(self, company_id: str, generation: str) -> KPIFrame:
+        failed = []
+
+        def fetch(department):
+            try:
+                return self.source.fetch(company_id, department)
+            except Exception as e:
+                # A missing department should not cost the company its whole analysis
+                print(f"Error fetching {department.name} KPIs for {company_id}: {str(e)}")
+                failed.append(department.name)
+                return []
+
+        # One round of parallel requests, merged in department order
+        frame = KPIFrame()
+        for department, rows in zip(self.departments, self._pool.map(fetch, self.departments)):
+            frame.append(department.name, rows)
+
+        # Only complete snapshots are cached, so a failed department is retried next time.
+        # A snapshot built across an invalidation may predate the upload: it is not cached,
+        # and if the invalidation lands between the check and the write it is dropped again.
+        if not failed and self._generation(company_id) == generation:
+            self.state_store.set("kpi_snapshots", company_id, frame.to_dict(), ttl=self.ttl)
+            if self._generation(company_id) != generation:
+                self.state_store.delete("kpi_snapshots", company_id)
+        return frame
+
+    def invalidate(self, company_id: str) -> None:
+        """Drop a company's cached snapshot, e.g. after a KPI upload."""
+        # A fresh random generation rather than an incremented one, so concurrent
+        # invalidations from different workers can never write the same value
+        self.state_store.set("kpi_generations", company_id, uuid.uuid4().hex)
+        self.state_store.delete("kpi_snapshots", company_id)
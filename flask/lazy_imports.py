@@ -0,0 +1,45 @@
+# Deferred imports for heavy optional dependencies
+# Importing google.generativeai, feedparser, bs4 and requests costs a noticeable share of
+# the service's cold start, yet health checks and cached responses never need them.
+
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported the first time one of its attributes is used.
+
+    Example:
+        genai = LazyModule("google.generativeai")
+        genai.configure(api_key=key)  # google.generativeai is imported here
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): Fully qualified module name to import on first use
+        """
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Import the module now (if not already imported) and return it."""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the underlying module has been imported yet."""
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
@@ -0,0 +1,249 @@
+# Load test for the Flask insights service
+# Starts the service against local stub upstreams (Gemini, DuckDuckGo, RSS), replays
+# payloads built from the sample KPI CSVs at several concurrency levels and reports
+# latency percentiles, throughput, fallback and error rates for each serving mode.
+#
+# Usage:
+#   python loadtest/run_load_test.py --concurrency 10,50,200 --modes full,preview,duplicate
+#   python loadtest/run_load_test.py --server gunicorn --workers 4 --gemini-latency 1.5
+
+import os
+import sys
+import csv
+import json
+import glob
+import math
+import time
+import random
+import socket
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import requests
+
+from stub_upstreams import StubUpstreams, UpstreamProfile, INDUSTRIES
+
+FLASK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_CSV_DIR = os.path.join(FLASK_DIR, "..", "backend", "sample-KPI-csv")
+STAGES = ["Ideation", "Seed", "Series A", "Series B"]
+
+# Serving modes:
+#   full      - Gemini-backed analysis, a different company per request
+#   preview   - rules-based analysis, no upstream calls
+#   duplicate - Gemini-backed analysis, every request identical (exercises coalescing)
+MODES = ["full", "preview", "duplicate"]
+
+
+def load_kpi_series(csv_dir: str = SAMPLE_CSV_DIR) -> Dict[str, Dict[str, List[float]]]:
+    """Read the sample KPI CSVs into {department: {kpi: [values...]}}."""
+    departments = {}
+    for path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+        department = os.path.splitext(os.path.basename(path))[0].replace("Dhruvaa_KPI_", "")
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        departments[department] = {
+            kpi: [float(row[kpi]) for row in rows if row.get(kpi)]
+            for kpi in rows[0] if kpi != "Date"
+        }
+    return departments
+
+
+def build_payloads(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Build realistic /generate-insights payloads: each company reports the latest values of
+    three departments' KPIs, the way the Node backend assembles them.
+    """
+    rng = random.Random(seed)
+    departments = load_kpi_series()
+    payloads = []
+    for i in range(count):
+        kpi_data = {}
+        for department in rng.sample(sorted(departments), k=min(3, len(departments))):
+            for kpi, series in departments[department].items():
+                # Jitter so that every company (and prompt) is different
+                kpi_data[kpi] = round(series[-1] * rng.uniform(0.8, 1.2), 2)
+        payloads.append({
+            "company_data": {
+                "name": f"loadtest-company-{i}",
+                "industry": rng.choice(INDUSTRIES),
+                "stage": rng.choice(STAGES),
+                "product": rng.choice(["platform", "marketplace", "analytics", "hardware"]),
+                "employees": rng.randint(2, 200),
+                "technology_readiness_level": rng.randint(1, 9),
+            },
+            "kpi_data": kpi_data,
+        })
+    return payloads
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_service(server: str, workers: int, env: Dict[str, str], workdir: str) -> (subprocess.Popen, str):
+    """Start the Flask service and wait until /health answers."""
+    port = _free_port()
+    service_env = dict(os.environ, **env)
+    service_env["PYTHONPATH"] = FLASK_DIR + os.pathsep + service_env.get("PYTHONPATH", "")
+    if server == "gunicorn":
+        service_env.update({"KPI_WORKERS": str(workers), "KPI_BIND": f"127.0.0.1:{port}"})
+        command = [sys.executable, "-m", "gunicorn", "-c", os.path.join(FLASK_DIR, "gunicorn.conf.py"),
+                   "--chdir", workdir, "flask_backend:app"]
+    else:
+        command = [sys.executable, "-c",
+                   f"import flask_backend; flask_backend.app.run(port={port}, threaded=True)"]
+
+    # Run from a scratch directory so saved insights do not end up in the repo
+    process = subprocess.Popen(command, cwd=workdir, env=service_env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(150):
+        try:
+            if requests.get(base_url + "/health", timeout=1).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Service failed to start ({server})")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def run_level(base_url: str, mode: str, concurrency: int, total: int, timeout: float) -> Dict[str, Any]:
+    """
+    Fire ``total`` requests with ``concurrency`` in flight and collect the results.
+
+    In the Gemini-backed modes, a response served by the rules-based fallback (after a shed
+    request or an exhausted quota) counts towards the fallback rate rather than as a success.
+    """
+    if mode == "duplicate":
+        payloads = build_payloads(1, seed=concurrency) * total
+    else:
+        payloads = build_payloads(total, seed=concurrency)
+    url = base_url + "/generate-insights" + ("?mode=preview" if mode == "preview" else "")
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def call(payload):
+        start = time.perf_counter()
+        ok, fallback = False, False
+        try:
+            response = session.post(url, json=payload, timeout=timeout)
+            body = response.json()
+            if response.status_code == 200 and "error" not in body:
+                fallback = mode != "preview" and body.get("mode") == "local"
+                ok = not fallback
+        except (requests.RequestException, ValueError):
+            pass
+        return time.perf_counter() - start, ok, fallback
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _, _ in results)
+    fallbacks = sum(1 for _, _, fallback in results if fallback)
+    errors = sum(1 for _, ok, fallback in results if not ok and not fallback)
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": total,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "fallback_rate": fallbacks / total if total else 0.0,
+        "error_rate": errors / total if total else 0.0,
+    }
+
+
+def print_report(rows: List[Dict[str, Any]]):
+    print(f"{'server':<9} {'mode':<10} {'conc':>5} {'reqs':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'req/s':>8} {'fallback':>9} {'errors':>7}")
+    for row in rows:
+        print(f"{row['server']:<9} {row['mode']:<10} {row['concurrency']:>5} {row['requests']:>6} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['throughput_rps']:>8.1f} "
+              f"{row['fallback_rate']:>9.1%} {row['error_rate']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Flask insights service against stub upstreams")
+    parser.add_argument("--concurrency", default="10,50,200", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests-per-level", type=int, default=0,
+                        help="Requests per level (default: 2x the concurrency)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated subset of {MODES}")
+    parser.add_argument("--server", choices=["flask", "gunicorn"], default="flask")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (gunicorn only)")
+    parser.add_argument("--timeout", type=float, default=120, help="Client timeout per request in seconds")
+    for name, latency in (("gemini", 0.8), ("search", 0.3), ("rss", 0.2)):
+        parser.add_argument(f"--{name}-latency", type=float, default=latency, help=f"Mean {name} stub latency (s)")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0, help=f"Fraction of failing {name} calls")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+    profiles = {
+        name: UpstreamProfile(latency=getattr(args, f"{name}_latency"), error_rate=getattr(args, f"{name}_error_rate"))
+        for name in ("gemini", "search", "rss")
+    }
+
+    rows = []
+    with StubUpstreams(**profiles) as stubs, tempfile.TemporaryDirectory() as workdir:
+        env = stubs.service_env()
+        env.update({
+            "GOOGLE_API_KEY": "loadtest-key",
+            "GEMINI_DAILY_LIMIT": "1000000",
+            "GEMINI_MAX_PER_MINUTE": "100000",
+            "GEMINI_MAX_CONCURRENT": "64",
+            "KPI_STATE_BACKEND": "sqlite:///" + os.path.join(workdir, "state.db"),
+        })
+        for mode in modes:
+            for concurrency in levels:
+                # Fresh service per run so caches start cold and runs do not affect each other
+                process, base_url = start_service(args.server, args.workers, env, workdir)
+                before = stubs.stats()
+                try:
+                    total = args.requests_per_level or concurrency * 2
+                    row = run_level(base_url, mode, concurrency, total, args.timeout)
+                    row["server"] = args.server
+                    after = stubs.stats()
+                    row["upstream_calls"] = {
+                        name: {key: after[name][key] - before[name][key] for key in after[name]}
+                        for name in after
+                    }
+                    rows.append(row)
+                finally:
+                    process.terminate()
+                    process.wait(timeout=30)
+                for path in glob.glob(os.path.join(workdir, "state.db*")):
+                    os.remove(path)
+
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
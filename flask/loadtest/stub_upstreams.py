@@ -0,0 +1,238 @@
+# Local stand-ins for the service's upstreams: the Gemini REST API, DuckDuckGo's HTML
+# search and the RSS news feeds. Each stub can inject latency and errors, so the service
+# can be load-tested without touching (or paying for) the real services.
+
+import json
+import time
+import random
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+INDUSTRIES = ["SaaS", "FinTech", "HealthTech", "EdTech", "Manufacturing", "Retail", "Logistics"]
+
+
+class UpstreamProfile:
+    """
+    Latency and error injection settings for one stub.
+
+    Args:
+        latency (float): Mean response delay in seconds
+        jitter (float): Delay varies uniformly by +/- this fraction of ``latency``
+        error_rate (float): Fraction of requests answered with HTTP 500
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.25, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    def delay(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        return max(self.latency * (1 + random.uniform(-self.jitter, self.jitter)), 0.0)
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    profile = UpstreamProfile()
+    counter = None
+
+    def log_message(self, format, *args):
+        # Keep load-test output readable
+        pass
+
+    def _respond(self, status: int, body: str, content_type: str):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, render):
+        self.counter.hit()
+        time.sleep(self.profile.delay())
+        if self.profile.should_fail():
+            self.counter.fail()
+            self._respond(500, "injected error", "text/plain")
+            return
+        status, body, content_type = render()
+        self._respond(status, body, content_type)
+
+
+class GeminiStubHandler(_StubHandler):
+    """Answers generateContent calls with canned competitor or SWOT JSON."""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        def render():
+            prompt = "".join(
+                part.get("text", "")
+                for content in request.get("contents", [])
+                for part in content.get("parts", [])
+            )
+            if "JSON array" in prompt:
+                text = json.dumps([
+                    {"name": f"Stub Competitor {i}", "description": "A stubbed competitor.",
+                     "differentiator": "Price", "founded": "2019", "status": "growth"}
+                    for i in range(1, 4)
+                ])
+            else:
+                text = json.dumps({
+                    "executive_summary": "Stubbed analysis [citation1].",
+                    "swot_analysis": {
+                        "strengths": ["Strong growth [citation1]"],
+                        "weaknesses": ["High CAC"],
+                        "opportunities": ["Expanding market"],
+                        "threats": ["Competition"],
+                    },
+                    "growth_tactics": ["Improve onboarding"],
+                    "competitive_positioning": "Compete on price.",
+                    "kpi_action_items": ["Reduce churn"],
+                    "citations": [{"id": "citation1", "source": "Stub", "title": "Stub article",
+                                   "date": "2025-01-01", "url": ""}],
+                })
+            response = {
+                "candidates": [{
+                    "content": {"parts": [{"text": text}], "role": "model"},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4},
+            }
+            return 200, json.dumps(response), "application/json"
+
+        self._handle(render)
+
+
+class SearchStubHandler(_StubHandler):
+    """Serves DuckDuckGo-style HTML results with a benchmark value in the snippet."""
+
+    def do_GET(self):
+        def render():
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query).get("q", [""])[0]
+            words = query.split()
+            # Queries look like "<industry> startup <stage> stage <kpi words> benchmark average"
+            kpi_term = " ".join(words[words.index("stage") + 1:-2]) if "stage" in words else query
+            value = round(random.uniform(5, 60), 1)
+            results = "".join(
+                f'<div class="result__body">'
+                f'<a class="result__a" href="https://example.com/{i}">{kpi_term} benchmarks report {i}</a>'
+                f'<span class="result__url">example.com/{i}</span>'
+                f'<div class="result__snippet">The industry average {kpi_term} benchmark is {value}%.</div>'
+                f'</div>'
+                for i in range(3)
+            )
+            return 200, f"<html><body>{results}</body></html>", "text/html"
+
+        self._handle(render)
+
+
+class RSSStubHandler(_StubHandler):
+    """Serves RSS feeds whose items mention the known industries."""
+
+    def do_GET(self):
+        def render():
+            parsed = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(parsed.query).get("q", [""])[0]
+            industries = [query.split()[0]] if query else INDUSTRIES
+            items = "".join(
+                f"<item><title>{industry} startups raise new funding round {i} ({parsed.path})</title>"
+                f"<link>https://news.example.com{parsed.path}/{industry}/{i}</link>"
+                f"<description>&lt;p&gt;Investors back {industry} companies in India.&lt;/p&gt;</description>"
+                f"<pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate></item>"
+                for industry in industries for i in range(2)
+            )
+            body = (f'<?xml version="1.0"?><rss version="2.0"><channel><title>Stub feed</title>'
+                    f'{items}</channel></rss>')
+            return 200, body, "application/rss+xml"
+
+        self._handle(render)
+
+
+class HitCounter:
+    """Thread-safe request and injected-error counter for one stub."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def hit(self):
+        with self._lock:
+            self.requests += 1
+
+    def fail(self):
+        with self._lock:
+            self.errors += 1
+
+
+class StubUpstreams:
+    """
+    Starts the three stub servers on free local ports.
+
+    Example:
+        with StubUpstreams(gemini=UpstreamProfile(latency=0.8)) as stubs:
+            env = stubs.service_env()
+    """
+
+    def __init__(self, gemini: UpstreamProfile = None, search: UpstreamProfile = None,
+                 rss: UpstreamProfile = None, host: str = "127.0.0.1"):
+        self.host = host
+        self.profiles = {
+            "gemini": gemini or UpstreamProfile(),
+            "search": search or UpstreamProfile(),
+            "rss": rss or UpstreamProfile(),
+        }
+        self.counters = {name: HitCounter() for name in self.profiles}
+        self._servers = {}
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        handlers = {"gemini": GeminiStubHandler, "search": SearchStubHandler, "rss": RSSStubHandler}
+        for name, base in handlers.items():
+            handler = type(f"{name.title()}Handler", (base,), {
+                "profile": self.profiles[name],
+                "counter": self.counters[name],
+            })
+            server = ThreadingHTTPServer((self.host, 0), handler)
+            server.daemon_threads = True
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._servers[name] = server
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def url(self, name: str) -> str:
+        host, port = self._servers[name].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def service_env(self) -> Dict[str, str]:
+        """Environment variables pointing the Flask service at these stubs."""
+        rss = self.url("rss")
+        return {
+            "GEMINI_API_ENDPOINT": self.url("gemini"),
+            "BENCHMARK_SEARCH_URL": self.url("search") + "/html/",
+            "NEWS_FEEDS": ",".join([f"{rss}/feed/{i}" for i in range(1, 7)] + [rss + "/search?q={industry}+startup+india"]),
+            "KPI_SCRAPE_DELAY": "0",
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: {"requests": c.requests, "errors": c.errors} for name, c in self.counters.items()}
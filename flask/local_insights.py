@@ -0,0 +1,377 @@
+# Rules-based insights engine
+# Builds the same JSON structure as the Gemini-powered SWOT analysis, but directly from
+# the benchmark comparison and KPI trend statistics, without any model call. Used as a
+# fallback once the daily Gemini quota is exhausted and as a cheap preview mode.
+
+import re
+import math
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# KPIs where a lower value is better
+LOWER_IS_BETTER_KPIS = {
+    "churn_rate", "burn_rate", "customer_churn_rate", "return_rate",
+    "order_fulfillment_time", "logistics_cost_per_unit",
+    "revenue_churn_rate", "customer_acquisition_cost", "cac_payback_period",
+    "sales_cycle_length", "lead_response_time", "debt_to_equity",
+    "cycle_time", "downtime", "scrap_rate", "rework_rate", "defect_density",
+    "maintenance_cost_per_unit", "energy_consumption_per_unit", "stock_out_rate",
+    "supply_chain_cycle_time", "procurement_cycle_time",
+}
+
+# Relative change below which a trend counts as flat
+TREND_THRESHOLD = 0.02
+
+# Keyword hints used to phrase action items, checked in order
+ACTION_HINTS = [
+    ("churn", "run a churn post-mortem on recently lost customers and fix the top cancellation reason"),
+    ("acquisition_cost", "shift spend toward the lowest-CAC channels and pause the worst-performing campaign"),
+    ("conversion", "audit the funnel step with the largest drop-off and A/B test one change per week"),
+    ("retention", "introduce a lifecycle touchpoint (onboarding check-in, usage nudge) for at-risk accounts"),
+    ("satisfaction", "collect structured feedback from recent customers and close the loop on complaints"),
+    ("promoter", "collect structured feedback from recent customers and close the loop on complaints"),
+    ("revenue", "review pricing and packaging, and prioritise upsell to the most engaged accounts"),
+    ("growth", "double down on the channel that drove the most growth last quarter"),
+    ("margin", "renegotiate the largest cost lines and review discounting policy"),
+    ("cost", "benchmark the largest cost drivers against suppliers and automate the most manual step"),
+    ("downtime", "move to preventive maintenance on the equipment with the most stoppages"),
+    ("time", "map the process end to end and remove the slowest hand-off"),
+    ("cycle", "map the process end to end and remove the slowest hand-off"),
+    ("rate", "set a weekly target and review the drivers behind the metric with the owning team"),
+]
+DEFAULT_HINT = "assign an owner, set a monthly target and review progress in the weekly team meeting"
+
+
+def to_snake_case(name: str) -> str:
+    """Convert a camelCase or spaced KPI name to snake_case (e.g. customerChurnRate -> customer_churn_rate)."""
+    name = re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name.strip())
+    return re.sub(r'[\s\-]+', '_', name).lower()
+
+
+def kpi_label(name: str) -> str:
+    """Human-readable KPI label (e.g. customerChurnRate -> Customer churn rate)."""
+    return to_snake_case(name).replace('_', ' ').capitalize()
+
+
+def is_lower_better(kpi: str) -> bool:
+    """Whether a lower value is better for this KPI."""
+    return to_snake_case(kpi) in LOWER_IS_BETTER_KPIS
+
+
+def compare_to_benchmark(kpi: str, value: float, benchmark_value: float) -> Dict[str, str]:
+    """
+    Compare a KPI value against its industry benchmark.
+
+    Returns:
+        Dict with "status" ("better", "close" or "worse"), and the "performance" and
+        "comparison" phrases used in the KPI analysis text
+    """
+    if is_lower_better(kpi):
+        # Lower is better for these metrics
+        if value < benchmark_value:
+            return {"status": "better", "performance": "better than", "comparison": "lower than"}
+        elif value > benchmark_value * 1.2:  # 20% worse
+            return {"status": "worse", "performance": "significantly worse than", "comparison": "higher than"}
+    else:
+        # Higher is better for most other metrics
+        if value > benchmark_value:
+            return {"status": "better", "performance": "better than", "comparison": "higher than"}
+        elif value < benchmark_value * 0.8:  # 20% worse
+            return {"status": "worse", "performance": "significantly worse than", "comparison": "lower than"}
+    return {"status": "close", "performance": "close to", "comparison": "similar to"}
+
+
+def benchmark_on_kpi_scale(kpi: str, value: float, bench: Dict[str, Any]) -> Optional[float]:
+    """
+    The benchmark's value in the same units as the KPI value.
+
+    The benchmark fetcher turns "7%" into 0.07, while KPI data usually records a 7% rate
+    as 7. A percentage benchmark is read on whichever scale (fraction or percent) lies
+    closer to the KPI value. Records stored before the "percent" flag existed are treated
+    as percentages if the KPI is a rate or score and the benchmark is a fraction.
+    """
+    bench_value = _to_float(bench.get("value"))
+    if bench_value is None:
+        return None
+    percent = bench.get("percent")
+    if percent is None:
+        name = to_snake_case(kpi)
+        percent = ("rate" in name or "score" in name) and 0 < abs(bench_value) <= 1
+    if percent and value and bench_value:
+        scaled = bench_value * 100
+        if abs(math.log(abs(value / scaled))) < abs(math.log(abs(value / bench_value))):
+            return round(scaled, 6)
+    return bench_value
+
+
+def trend_statistics(kpi: str, series: List[float]) -> Optional[Dict[str, Any]]:
+    """
+    Compute simple trend statistics for a KPI series (oldest value first).
+
+    Returns:
+        Dict with first/last values, relative change, least-squares slope per period and
+        the direction ("improving", "declining" or "flat"), or None for fewer than 2 points
+    """
+    if len(series) < 2:
+        return None
+
+    n = len(series)
+    mean_x = (n - 1) / 2
+    mean_y = sum(series) / n
+    variance = sum((x - mean_x) ** 2 for x in range(n))
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(series)) / variance
+
+    first, last = series[0], series[-1]
+    change = (last - first) / abs(first) if first else 0.0
+    relative_slope = slope * (n - 1) / abs(mean_y) if mean_y else 0.0
+
+    if abs(relative_slope) < TREND_THRESHOLD:
+        direction = "flat"
+    elif (relative_slope > 0) != is_lower_better(kpi):
+        direction = "improving"
+    else:
+        direction = "declining"
+
+    return {
+        "first": first,
+        "last": last,
+        "change": change,
+        "slope": slope,
+        "direction": direction,
+        "periods": n,
+    }
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_value(value: float) -> str:
+    return f"{value:,.2f}".rstrip('0').rstrip('.')
+
+
+class LocalInsightsEngine:
+    """
+    Generates startup insights with rules instead of a model call.
+
+    The output follows the same JSON shape as StartupKPIAgent.generate_startup_insights
+    (executive_summary, swot_analysis, growth_tactics, competitive_positioning,
+    kpi_action_items, citations), so the frontend can render it unchanged.
+    """
+
+    def __init__(self, max_items: int = 4):
+        """
+        Args:
+            max_items (int): Maximum number of entries per SWOT list
+        """
+        self.max_items = max_items
+
+    def assess_kpis(self, kpi_data: Dict[str, Any], benchmark_data: Dict[str, Dict[str, Any]],
+                    kpi_series: Optional[Dict[str, List[Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Compare each KPI with its benchmark and trend.
+
+        Args:
+            kpi_data (Dict): KPI name -> latest value, or a list of values (oldest first)
+            benchmark_data (Dict): KPI name -> benchmark info from IndustryBenchmarkFetcher
+            kpi_series (Dict, optional): KPI name -> list of values (oldest first)
+
+        Returns:
+            List of per-KPI assessments
+        """
+        kpi_series = kpi_series or {}
+        assessments = []
+
+        for kpi, raw_value in kpi_data.items():
+            series = kpi_series.get(kpi)
+            if series is None and isinstance(raw_value, (list, tuple)):
+                series = raw_value
+            series = [v for v in (_to_float(x) for x in (series or [])) if v is not None]
+            value = series[-1] if series else _to_float(raw_value)
+            if value is None:
+                continue
+
+            assessment = {
+                "kpi": kpi,
+                "label": kpi_label(kpi),
+                "value": value,
+                "benchmark": None,
+                "status": None,
+                "trend": trend_statistics(kpi, series),
+                "source_title": None,
+                "source_url": None,
+                "retrieved_at": None,
+            }
+
+            bench = benchmark_data.get(kpi, {})
+            bench_value = benchmark_on_kpi_scale(kpi, value, bench)
+            if bench_value is not None:
+                assessment["benchmark"] = bench_value
+                assessment["status"] = compare_to_benchmark(kpi, value, bench_value)["status"]
+                assessment["source_title"] = bench.get("source_title")
+                assessment["source_url"] = bench.get("source_url", "")
+                assessment["retrieved_at"] = bench.get("retrieved_at")
+
+            assessments.append(assessment)
+
+        return assessments
+
+    def generate(self, company_data: Dict[str, Any], kpi_data: Dict[str, Any],
+                 benchmark_data: Optional[Dict[str, Dict[str, Any]]] = None,
+                 kpi_series: Optional[Dict[str, List[Any]]] = None,
+                 industry_news: Optional[List[Dict[str, str]]] = None,
+                 competitors: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """
+        Generate insights from KPI data, benchmarks and (optionally cached) news and competitors.
+
+        Args:
+            company_data (Dict): Information about the company (name, industry, stage, etc.)
+            kpi_data (Dict): KPI name -> latest value, or a list of values (oldest first)
+            benchmark_data (Dict, optional): KPI name -> benchmark info
+            kpi_series (Dict, optional): KPI name -> list of values (oldest first)
+            industry_news (List, optional): Articles as returned by fetch_industry_news
+            competitors (List, optional): Competitors as returned by fetch_competitor_info
+
+        Returns:
+            Dict with insights in the same shape as the Gemini-generated ones
+        """
+        industry_news = industry_news or []
+        competitors = [c for c in (competitors or []) if c.get("name") not in (None, "", "Unknown Competitor")]
+        assessments = self.assess_kpis(kpi_data, benchmark_data or {}, kpi_series)
+
+        citations = []
+        citation_ids = {}
+
+        def cite(assessment):
+            source_title = assessment.get("source_title")
+            if not source_title:
+                return ""
+            if source_title not in citation_ids:
+                citation_ids[source_title] = f"benchmark_{len(citations) + 1}"
+                citations.append({
+                    "id": citation_ids[source_title],
+                    "source": source_title,
+                    "title": f"Benchmark data for {assessment['kpi']}",
+                    "date": "Retrieved " + (assessment.get("retrieved_at") or datetime.now().isoformat())[:10],
+                    "url": assessment.get("source_url", "")
+                })
+            return f" [{citation_ids[source_title]}]"
+
+        news_ids = []
+        for article in industry_news[:self.max_items]:
+            citation_id = f"news_{len(citations) + 1}"
+            news_ids.append((citation_id, article))
+            citations.append({
+                "id": citation_id,
+                "source": article.get("source", "Unknown"),
+                "title": article.get("title", "Unknown"),
+                "date": article.get("date", "Unknown"),
+                "url": article.get("url", "")
+            })
+
+        def describe(a):
+            text = f"{a['label']} at {_format_value(a['value'])}"
+            if a["benchmark"] is not None:
+                relation = {"better": "ahead of", "close": "in line with", "worse": "well behind"}[a["status"]]
+                text += f", {relation} the industry benchmark of {_format_value(a['benchmark'])}{cite(a)}"
+            if a["trend"] and a["trend"]["direction"] != "flat":
+                text += f", {a['trend']['direction']} ({a['trend']['change']:+.1%} over {a['trend']['periods']} periods)"
+            return text
+
+        def score(a):
+            # Positive for good news, negative for bad news
+            points = {"better": 2, "close": 0, "worse": -2, None: 0}[a["status"]]
+            if a["trend"]:
+                points += {"improving": 1, "flat": 0, "declining": -1}[a["trend"]["direction"]]
+            return points
+
+        ranked = sorted(assessments, key=score, reverse=True)
+        strong = [a for a in ranked if score(a) > 0]
+        weak = [a for a in reversed(ranked) if score(a) < 0]
+        close_and_improving = [a for a in ranked if a["status"] == "close" and a["trend"]
+                               and a["trend"]["direction"] == "improving"]
+
+        industry = company_data.get("industry", "Technology")
+        stage = company_data.get("stage", "early-stage")
+        name = company_data.get("name", "The company")
+
+        strengths = [f"{describe(a)}." for a in strong[:self.max_items]]
+        weaknesses = [f"{describe(a)}." for a in weak[:self.max_items]]
+        if not weaknesses:
+            weaknesses.append("No KPI is behind its benchmark or declining, but benchmark coverage is limited; "
+                              "validate performance against peers before relying on it.")
+
+        opportunities = [f"{describe(a)}; a small push could move it ahead of peers." for a in close_and_improving]
+        market_cagr = company_data.get("market_cagr") or company_data.get("marketCGAR")
+        if market_cagr not in (None, "", "unknown"):
+            opportunities.append(f"The target market is growing at roughly {market_cagr}% a year, leaving room to grow with it.")
+        for citation_id, article in news_ids:
+            opportunities.append(f"Industry news to watch: {article.get('title', 'Untitled')} [{citation_id}].")
+        opportunities = opportunities[:self.max_items]
+
+        threats = [f"{a['label']} is declining ({a['trend']['change']:+.1%} over {a['trend']['periods']} periods)."
+                   for a in weak if a["trend"] and a["trend"]["direction"] == "declining"]
+        if competitors:
+            threats.append(f"Competition from {', '.join(c['name'] for c in competitors[:3])} in the {industry} space.")
+        if not threats:
+            threats.append(f"Competitive pressure and shifting market conditions in the {industry} space "
+                           f"could erode current KPI performance.")
+        threats = threats[:self.max_items]
+
+        kpi_action_items = [
+            f"{a['label']}: {self._hint(a['kpi'])}"
+            + (f" (target: the benchmark of {_format_value(a['benchmark'])}{cite(a)})" if a["benchmark"] is not None else "")
+            + "."
+            for a in weak[:5]
+        ]
+        if len(kpi_action_items) < 3:
+            kpi_action_items += [f"{a['label']}: keep the current approach and document what is working so it can be repeated."
+                                 for a in strong[:3 - len(kpi_action_items)]]
+
+        growth_tactics = [f"Prioritise {a['label'].lower()}: {self._hint(a['kpi'])}." for a in weak[:3]]
+        growth_tactics += [f"Use the strong {a['label'].lower()} as a proof point in sales and investor conversations."
+                           for a in strong[:2]]
+
+        benchmarked = [a for a in assessments if a["status"] is not None]
+        ahead = sum(1 for a in benchmarked if a["status"] == "better")
+        summary = (f"{name} is a {stage} {industry} company tracking {len(assessments)} KPIs"
+                   + (f", {ahead} of {len(benchmarked)} benchmarked KPIs ahead of the industry" if benchmarked else "")
+                   + ". ")
+        if strong:
+            summary += f"Its strongest signal is {strong[0]['label'].lower()}. "
+        if weak:
+            summary += f"The most urgent area to improve is {weak[0]['label'].lower()}. "
+        summary += "This is a rules-based preview generated without AI analysis."
+
+        if strong:
+            positioning = (f"Lead with {', '.join(a['label'].lower() for a in strong[:2])} when positioning against "
+                           f"{'competitors such as ' + ', '.join(c['name'] for c in competitors[:2]) if competitors else 'other ' + industry + ' startups'}, "
+                           f"and address {weak[0]['label'].lower() if weak else 'remaining gaps'} before scaling spend.")
+        else:
+            positioning = (f"No KPI is clearly ahead of the {industry} benchmarks yet; focus on one differentiating metric "
+                           f"before competing head-on.")
+
+        return {
+            "executive_summary": summary,
+            "swot_analysis": {
+                "strengths": strengths,
+                "weaknesses": weaknesses,
+                "opportunities": opportunities,
+                "threats": threats,
+            },
+            "growth_tactics": growth_tactics,
+            "competitive_positioning": positioning,
+            "kpi_action_items": kpi_action_items,
+            "citations": citations,
+            "mode": "local",
+        }
+
+    def _hint(self, kpi: str) -> str:
+        snake = to_snake_case(kpi)
+        for keyword, hint in ACTION_HINTS:
+            if keyword in snake:
+                return hint
+        return DEFAULT_HINT
@@ -5,109 +5,310 @@ import os
 import json
 import time
 import re
+import math
 from datetime import datetime
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
 import threading
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from state_store import create_state_store
+from singleflight import SingleFlight
+from local_insights import LocalInsightsEngine, benchmark_on_kpi_scale, compare_to_benchmark
+from news_pool import ArticlePool
+from gemini_scheduler import GeminiScheduler, GeminiQuotaExceeded, Priority, RequestShed
+from lazy_imports import LazyModule
+
+# Heavy dependencies are imported on first use to keep cold starts fast
 
 # Google Gemini API
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+genai = LazyModule("google.generativeai")
+genai_types = LazyModule("google.generativeai.types")
 
 # For news fetching and web search
-import requests
-from requests.exceptions import RequestException
-import feedparser
-from bs4 import BeautifulSoup
+requests = LazyModule("requests")
+feedparser = LazyModule("feedparser")
+bs4 = LazyModule("bs4")
 
 # For search utilities
 import urllib.parse
 
+# Benchmark freshness and confidence policy
+BENCHMARK_MAX_SEARCHES = 5  # Limit total search requests per call
+BENCHMARK_RESULTS_CHECKED = 5  # Search results examined per KPI
+BENCHMARK_MAX_AGE = 86400 * 30  # Refresh any benchmark older than 30 days
+BENCHMARK_MIN_CONFIDENCE = 0.6  # Below this, a benchmark is retried...
+BENCHMARK_RETRY_AFTER = 86400  # ...once a day
+BENCHMARK_AGREEMENT_TOLERANCE = 0.2  # Values within 20% of each other agree
+
+# Upstream endpoints and pacing, overridable to run against local stubs (see loadtest/)
+BENCHMARK_SEARCH_URL = os.getenv("BENCHMARK_SEARCH_URL", "https://duckduckgo.com/html/")
+SCRAPE_DELAY = float(os.getenv("KPI_SCRAPE_DELAY", 2))  # Seconds between requests to external sites
+
 
 class IndustryBenchmarkFetcher:
     """
     Fetches industry benchmarks from the web using search techniques.
     """
 
-    def __init__(self, user_agent=None):
+    def __init__(self, user_agent=None, state_store=None):
         """
         Initialize the benchmark fetcher with request settings.
 
         Args:
             user_agent (str, optional): User agent for requests. Defaults to a standard one.
+            state_store (optional): Store used to cache benchmark data. Defaults to a local store.
         """
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': user_agent or 'Mozilla/5.0 (compatible; StartupAnalyzer/0.1; Educational Project)',
-            'Accept': 'text/html,application/xhtml+xml,application/xml',
-            'Accept-Language': 'en-US,en;q=0.9'
-        })
+        self.user_agent = user_agent or 'Mozilla/5.0 (compatible; StartupAnalyzer/0.1; Educational Project)'
+        self._session = None
 
         # Cache for benchmark data
-        self.benchmark_cache = {}
+        self.state_store = state_store or create_state_store("local")
+
+        # Coalesces concurrent searches for the same benchmarks
+        self._flights = SingleFlight()
+
+        # Stale and low-confidence benchmarks found on the interactive path are refreshed
+        # here, one search batch at a time, while the cached values are served
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="benchmark-refresh")
+        self._pending_refreshes = set()
+        self._pending_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """HTTP session for search requests, created on first use."""
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers.update({
+                'User-Agent': self.user_agent,
+                'Accept': 'text/html,application/xhtml+xml,application/xml',
+                'Accept-Language': 'en-US,en;q=0.9'
+            })
+        return self._session
 
-    def fetch_benchmarks_for_kpis(self, industry: str, stage: str, kpi_list: List[str]) -> Dict[str, Dict[str, Any]]:
+    def fetch_benchmarks_for_kpis(self, industry: str, stage: str, kpi_list: List[str],
+                                  wait_for_refresh: bool = True) -> Dict[str, Dict[str, Any]]:
         """
         Fetch benchmark data for specified KPIs in an industry.
 
+        Cached benchmarks are reused until they are old or low-confidence; the limited
+        search budget per call goes to missing KPIs first, then low-confidence, then stale ones.
+
         Args:
             industry (str): Industry name (e.g., "SaaS", "HealthTech")
             stage (str): Company stage (e.g., "Seed", "Series A")
             kpi_list (List[str]): List of KPI names to search benchmarks for
+            wait_for_refresh (bool): If False, only the first batch of KPIs with nothing cached
+                                     is searched before returning; the remaining ones, and
+                                     stale or low-confidence ones (served from the cache
+                                     meanwhile), are searched in the background
 
         Returns:
             Dict with KPI names as keys and benchmark info as values
         """
         # Check cache first
-        cache_key = f"{industry.lower()}_{stage.lower()}"
-        if cache_key in self.benchmark_cache:
-            cached_data = self.benchmark_cache[cache_key]
-            # Filter for requested KPIs
-            return {k: v for k, v in cached_data.items() if k in kpi_list}
+        cached = self._get_cached_records(industry, stage, kpi_list)
+        now = datetime.now()
+        to_fetch = [kpi for kpi in kpi_list if kpi not in cached or self.needs_refresh(cached[kpi], now)]
+
+        if not wait_for_refresh:
+            # KPIs already queued for a background search are not searched again here
+            with self._pending_lock:
+                to_fetch = [kpi for kpi in to_fetch
+                            if (industry.lower(), stage.lower(), kpi) not in self._pending_refreshes]
+            missing = [kpi for kpi in to_fetch if kpi not in cached]
+            background = [kpi for kpi in to_fetch if kpi in cached] + missing[BENCHMARK_MAX_SEARCHES:]
+            if background:
+                self._refresh_in_background(industry, stage, background)
+            to_fetch = missing[:BENCHMARK_MAX_SEARCHES]
+
+        if to_fetch:
+            # Missing KPIs first, then the least confident, then the oldest
+            to_fetch.sort(key=lambda kpi: (kpi in cached,
+                                           cached.get(kpi, {}).get("confidence", 0),
+                                           cached.get(kpi, {}).get("retrieved_at", "")))
+            to_fetch = to_fetch[:BENCHMARK_MAX_SEARCHES]
+            cached.update(self._flights.do(
+                (industry.lower(), stage.lower(), tuple(to_fetch)),
+                self._fetch_benchmarks, industry, stage, to_fetch, cached
+            ))
+
+        return {kpi: record for kpi, record in cached.items() if self._has_benchmark(record)}
+
+    def _refresh_in_background(self, industry: str, stage: str, kpi_list: List[str]) -> None:
+        with self._pending_lock:
+            kpi_list = [kpi for kpi in kpi_list
+                        if (industry.lower(), stage.lower(), kpi) not in self._pending_refreshes]
+            if not kpi_list:
+                return
+            keys = {(industry.lower(), stage.lower(), kpi) for kpi in kpi_list}
+            self._pending_refreshes |= keys
+
+        def refresh():
+            try:
+                # One search batch at a time until every KPI has been searched. Each search
+                # stores a record, even a failed one, so each batch makes progress; another
+                # worker may also have refreshed some of them in the meantime.
+                for batch in range(math.ceil(len(kpi_list) / BENCHMARK_MAX_SEARCHES)):
+                    cached = self._get_cached_records(industry, stage, kpi_list)
+                    if not any(kpi not in cached or self.needs_refresh(cached[kpi]) for kpi in kpi_list):
+                        break
+                    if batch > 0:
+                        time.sleep(SCRAPE_DELAY)
+                    self.fetch_benchmarks_for_kpis(industry, stage, kpi_list)
+            except Exception as e:
+                print(f"Error refreshing benchmarks: {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending_refreshes -= keys
 
-        # Results container
-        results = {}
+        self._refresher.submit(refresh)
+
+    def get_cached_benchmarks(self, industry: str, stage: str, kpi_list: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return cached benchmark data for the given KPIs without searching the web.
 
-        # Rate limiting
-        requests_made = 0
-        max_requests = 5  # Limit total search requests
+        Returns:
+            Dict with KPI names as keys and benchmark info as values (KPIs without a cached
+            benchmark are left out)
+        """
+        cached = self._get_cached_records(industry, stage, kpi_list)
+        return {kpi: record for kpi, record in cached.items() if self._has_benchmark(record)}
+
+    def needs_refresh(self, record: Dict[str, Any], now: datetime = None) -> bool:
+        """
+        Whether a stored benchmark should be searched again.
 
+        Entries older than BENCHMARK_MAX_AGE and low-confidence entries (including KPIs
+        where nothing was found) are retried once BENCHMARK_RETRY_AFTER has passed since the
+        last search, so a benchmark the search no longer finds is not searched on every call.
+        """
+        now = now or datetime.now()
+        retrieved_at = datetime.fromisoformat(record.get("retrieved_at", "1970-01-01T00:00:00"))
+        checked_at = datetime.fromisoformat(record.get("checked_at", record.get("retrieved_at", "1970-01-01T00:00:00")))
+        if (now - checked_at).total_seconds() <= BENCHMARK_RETRY_AFTER:
+            return False
+        return ((now - retrieved_at).total_seconds() > BENCHMARK_MAX_AGE or
+                record.get("confidence", 0) < BENCHMARK_MIN_CONFIDENCE)
+
+    def _cache_key(self, industry: str, stage: str, kpi: str) -> str:
+        return f"{industry.lower()}_{stage.lower()}_{kpi}"
+
+    def _get_cached_records(self, industry: str, stage: str, kpi_list: List[str]) -> Dict[str, Dict[str, Any]]:
+        records = {}
         for kpi in kpi_list:
-            if requests_made >= max_requests:
-                break
+            record = self.state_store.get("benchmarks", self._cache_key(industry, stage, kpi))
+            if record is not None:
+                records[kpi] = record
+        return records
+
+    @staticmethod
+    def _has_benchmark(record: Dict[str, Any]) -> bool:
+        return record.get("value") is not None or record.get("range") is not None
+
+    def _fetch_benchmarks(self, industry: str, stage: str, kpi_list: List[str],
+                          cached: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Search the web for benchmarks and store them (uncached path of fetch_benchmarks_for_kpis)."""
+        # Results container
+        results = {}
 
+        for requests_made, kpi in enumerate(kpi_list):
             # Normalize KPI name for search
             kpi_search_term = kpi.replace('_', ' ')
 
-            # Skip if already in results
-            if kpi in results:
-                continue
-
             # Create search query
             search_query = f"{industry} startup {stage} stage {kpi_search_term} benchmark average"
 
             # Fetch search results
             try:
                 if requests_made > 0:
-                    time.sleep(2)  # Rate limiting
+                    time.sleep(SCRAPE_DELAY)  # Rate limiting
 
                 benchmark_data = self._search_and_extract_benchmark(search_query, kpi_search_term)
-                requests_made += 1
-
-                if benchmark_data:
-                    results[kpi] = benchmark_data
             except Exception as e:
                 print(f"Error fetching benchmark for {kpi}: {e}")
+                # Stored as an empty result, so the KPI waits BENCHMARK_RETRY_AFTER before
+                # it is searched again
+                benchmark_data = None
 
-        # Cache results
-        self.benchmark_cache[cache_key] = results
+            record = self._merge_benchmark(cached.get(kpi), benchmark_data)
+            self.state_store.set("benchmarks", self._cache_key(industry, stage, kpi), record)
+            results[kpi] = record
 
         return results
 
+    def _merge_benchmark(self, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine a fresh search result with the stored benchmark.
+
+        Agreeing results pool their sources (raising confidence); otherwise the more
+        confident result wins, unless the stored one is past BENCHMARK_MAX_AGE.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        new = dict(new or {"value": None, "range": None, "confidence": 0.0, "source_count": 0, "sources": []})
+        new["retrieved_at"] = new["checked_at"] = now
+
+        if not old or not self._has_benchmark(old):
+            return new
+
+        if self._has_benchmark(new) and self._values_agree(old.get("value"), new.get("value")) \
+                and old.get("range") == new.get("range"):
+            sources = old.get("sources", []) + [s for s in new.get("sources", []) if s not in old.get("sources", [])]
+            # Results that disagreed stay counted; the larger count is kept rather than the
+            # sum, as a repeat search usually finds the same dissenting pages again
+            dissent = max(self._dissent(old), self._dissent(new))
+            merged = dict(new)
+            merged["sources"] = sources
+            merged["source_count"] = len(sources)
+            merged["candidate_count"] = len(sources) + dissent
+            merged["confidence"] = self._confidence(len(sources), len(sources) + dissent, new.get("value") is None)
+            return merged
+
+        old_expired = (datetime.now() - datetime.fromisoformat(old["retrieved_at"])).total_seconds() > BENCHMARK_MAX_AGE
+        if new.get("confidence", 0) >= old.get("confidence", 0) or (old_expired and self._has_benchmark(new)):
+            return new
+
+        # Keep the better stored benchmark, but remember that we checked
+        kept = dict(old)
+        kept["checked_at"] = now
+        return kept
+
+    @staticmethod
+    def _dissent(record: Dict[str, Any]) -> int:
+        """Number of search results that disagreed with a benchmark."""
+        return max(record.get("candidate_count", record.get("source_count", 0)) - record.get("source_count", 0), 0)
+
+    @staticmethod
+    def _values_agree(a, b) -> bool:
+        if a is None or b is None:
+            return a is b
+        if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+            return a == b
+        return abs(a - b) <= BENCHMARK_AGREEMENT_TOLERANCE * max(abs(a), abs(b))
+
+    @staticmethod
+    def _confidence(agreeing: int, candidates: int, range_only: bool = False) -> float:
+        """
+        Score how much a benchmark can be trusted, from 0 to 1.
+
+        One matching snippet scores 0.5, and each additional agreeing source raises the score.
+        Disagreement among the results lowers it, and range-only results count for less.
+        """
+        if agreeing == 0 or candidates == 0:
+            return 0.0
+        confidence = agreeing / (agreeing + 1) * (0.5 + 0.5 * agreeing / candidates)
+        if range_only:
+            confidence *= 0.8
+        return round(confidence, 2)
+
     def _search_and_extract_benchmark(self, search_query: str, kpi_term: str) -> Dict[str, Any]:
         """
         Perform a search and extract benchmark information.
 
+        All of the top results are checked. The returned benchmark is the one most sources
+        agree on, with the number of agreeing sources and a confidence score.
+
         Args:
             search_query (str): The search query
             kpi_term (str): The KPI term to look for in results
@@ -121,19 +322,20 @@ class IndustryBenchmarkFetcher:
         # For educational purposes, we're using a public search API that doesn't require authentication
         # Note: In production, use official APIs with proper authentication
         encoded_query = urllib.parse.quote(search_query)
-        search_url = f"https://duckduckgo.com/html/?q={encoded_query}"
+        search_url = f"{BENCHMARK_SEARCH_URL}?q={encoded_query}"
 
         try:
             response = self.session.get(search_url, timeout=10)
             response.raise_for_status()
 
             # Parse the search results
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
 
             # Extract search results
             search_results = soup.select('.result__body')
+            candidates = []
 
-            for result in search_results[:3]:  # Check top 3 results
+            for result in search_results[:BENCHMARK_RESULTS_CHECKED]:
                 # Get URL and title
                 link_tag = result.select_one('.result__a')
                 if not link_tag:
@@ -145,7 +347,7 @@ class IndustryBenchmarkFetcher:
                 # Extract the URL
                 url = ""
                 if url_tag:
-                    url = url_tag.text
+                    url = url_tag.text.strip()
                 else:
                     href = link_tag.get('href', '')
                     if href and 'http' in href:
@@ -161,18 +363,37 @@ class IndustryBenchmarkFetcher:
                     benchmark_values = self._extract_benchmark_values(snippet, kpi_term)
 
                     if benchmark_values:
-                        return {
+                        candidates.append({
                             "value": benchmark_values.get("value"),
                             "range": benchmark_values.get("range"),
+                            "percent": benchmark_values.get("percent", False),
                             "source_title": title,
                             "source_snippet": snippet,
                             "source_url": url
-                        }
+                        })
 
             # If no good results found, return empty dict
-            return {}
-
-        except RequestException as e:
+            if not candidates:
+                return {}
+
+            # Pick the candidate that agrees with the most others (earlier results win ties)
+            best, agreeing = None, []
+            for candidate in candidates:
+                peers = [c for c in candidates
+                         if self._values_agree(candidate["value"], c["value"]) and candidate["range"] == c["range"]]
+                if len(peers) > len(agreeing):
+                    best, agreeing = candidate, peers
+
+            sources = []
+            for peer in agreeing:
+                source = peer["source_url"] or peer["source_title"]
+                if source not in sources:
+                    sources.append(source)
+
+            return dict(best, sources=sources, source_count=len(sources), candidate_count=len(candidates),
+                        confidence=self._confidence(len(sources), len(candidates), best["value"] is None))
+
+        except requests.exceptions.RequestException as e:
             print(f"Search request error: {e}")
             return {}
 
@@ -236,9 +457,10 @@ class IndustryBenchmarkFetcher:
                         # Remove % if present
                         numeric_value = value_text.rstrip('%')
                         value = float(numeric_value)
-                        if '%' in value_text:
+                        percent = '%' in value_text
+                        if percent:
                             value /= 100  # Convert percentage to decimal
-                        return {"value": value, "range": None}
+                        return {"value": value, "range": None, "percent": percent}
                     except ValueError:
                         return {"value": value_text, "range": None}
 
@@ -246,57 +468,96 @@ class IndustryBenchmarkFetcher:
         return {}
 
 
-GEMINI_DAILY_LIMIT = 300
+GEMINI_DAILY_LIMIT = int(os.getenv("GEMINI_DAILY_LIMIT", 300))
+# Alternative Gemini REST endpoint (e.g. a local stub); the public API is used when unset
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+GEMINI_MAX_CONCURRENT = int(os.getenv("GEMINI_MAX_CONCURRENT", 4))
+GEMINI_MAX_PER_MINUTE = int(os.getenv("GEMINI_MAX_PER_MINUTE", 15))
+
+# Seconds a request may wait in the scheduler queue before it is shed
+INTERACTIVE_QUEUE_TIMEOUT = 30
+BATCH_QUEUE_TIMEOUT = 10
+PREFETCH_QUEUE_TIMEOUT = 5  # Prefetches hold a request thread too, so they give up first
+QUEUE_TIMEOUTS = {
+    Priority.INTERACTIVE: INTERACTIVE_QUEUE_TIMEOUT,
+    Priority.BATCH: BATCH_QUEUE_TIMEOUT,
+    Priority.PREFETCH: PREFETCH_QUEUE_TIMEOUT,
+}
 GEMINI_REQUEST_COUNT_FILE = os.path.join(os.path.dirname(__file__), 'gemini_request_count.json')
-GEMINI_REQUEST_LOCK = threading.Lock()
-
-def _get_today_str():
-    return datetime.now().strftime('%Y-%m-%d')
-
-def _load_gemini_request_count():
-    if not os.path.exists(GEMINI_REQUEST_COUNT_FILE):
-        return {"date": _get_today_str(), "count": 0}
-    try:
-        with open(GEMINI_REQUEST_COUNT_FILE, 'r') as f:
-            data = json.load(f)
-        if data.get("date") != _get_today_str():
-            return {"date": _get_today_str(), "count": 0}
-        return data
-    except Exception:
-        return {"date": _get_today_str(), "count": 0}
-
-def _save_gemini_request_count(data):
-    with open(GEMINI_REQUEST_COUNT_FILE, 'w') as f:
-        json.dump(data, f)
 
-class StartupKPIAgent:
-    """
-    An agent that analyzes startup KPIs and provides actionable insights using SWOT analysis
-    powered by Google's Gemini 2.0 Flash API and web search for industry benchmarks.
+# List of RSS feeds for startup/tech news
+# Including global and India-specific sources. NEWS_FEEDS (comma-separated) overrides it.
+DEFAULT_NEWS_FEEDS = [
+    # Global sources
+    "https://feeds.feedburner.com/TechCrunch/",
+    "https://news.ycombinator.com/rss",
+    "https://www.techmeme.com/feed/",
+
+    # India-specific sources
+    "https://yourstory.com/feed/",  # YourStory RSS feed
+    "https://inc42.com/feed/",  # Inc42 RSS feed
+    "https://economictimes.indiatimes.com/small-biz/startups/rssfeeds/11993050.cms",  # ET StartupWorld
+
+    # Dynamic search query
+    "https://news.google.com/rss/search?q={industry}+startup+india"  # India-focused search
+]
+NEWS_FEEDS = [feed.strip() for feed in os.getenv("NEWS_FEEDS", "").split(",") if feed.strip()] or DEFAULT_NEWS_FEEDS
+
+NEWS_CACHE_TTL = 86400  # 24 hours
+NEWS_RETRY_AFTER = 300  # Wait before retrying feeds that returned nothing (e.g. an outage)
+NEWS_POOL_SIZE = 1000  # Articles kept in memory across all feeds
+NEWS_ENTRIES_PER_FEED = 20
+NEWS_USER_AGENT = 'Mozilla/5.0 (compatible; StartupAnalyzer/0.1; Educational Project; +http://yourprojectwebsite.com/)'
+COMPETITOR_CACHE_TTL = 86400 * 7  # One week
+
+_GEMINI_MODEL = None
+_GEMINI_MODEL_LOCK = threading.Lock()
+
+
+def _resolve_api_key(api_key=None):
+    """Return the given API key, falling back to GOOGLE_API_KEY from the environment or .env file."""
+    if api_key is None:
+        # Load environment variables
+        load_dotenv()
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if api_key is None:
+            raise ValueError("API key must be provided or set as GOOGLE_API_KEY in .env file")
+    return api_key
+
+
+def get_gemini_model(api_key=None):
     """
+    Configure the Gemini API and build the model client once per process.
 
-    def __init__(self, api_key=None):
-        """
-        Initialize the agent with the Google Gemini API.
+    Calling this before forking workers (e.g. gunicorn with preload_app) means the
+    environment loading, API configuration and model construction happen only once;
+    forked workers inherit the ready-made client.
 
-        Args:
-            api_key (str, optional): Google API key. If not provided, will look for
-                                     GOOGLE_API_KEY environment variable.
-        """
-        # Load environment variables
-        load_dotenv()
+    Args:
+        api_key (str, optional): Google API key. If not provided, will look for
+                                 GOOGLE_API_KEY environment variable.
 
-        # Set up API key
-        if api_key is None:
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if api_key is None:
-                raise ValueError("API key must be provided or set as GOOGLE_API_KEY in .env file")
+    Returns:
+        genai.GenerativeModel: The shared model client
+    """
+    global _GEMINI_MODEL
+    with _GEMINI_MODEL_LOCK:
+        if _GEMINI_MODEL is not None:
+            return _GEMINI_MODEL
+
+        api_key = _resolve_api_key(api_key)
+        HarmCategory = genai_types.HarmCategory
+        HarmBlockThreshold = genai_types.HarmBlockThreshold
 
         # Configure the Gemini API
-        genai.configure(api_key=api_key)
+        if GEMINI_API_ENDPOINT:
+            genai.configure(api_key=api_key, transport="rest",
+                            client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+        else:
+            genai.configure(api_key=api_key)
 
         # Set up the model configuration
-        self.model = genai.GenerativeModel(
+        _GEMINI_MODEL = genai.GenerativeModel(
             model_name="gemini-2.0-flash",  # Using Gemini 2.0 Flash
             generation_config={
                 "temperature": 0.3,  # Slightly higher temperature for more creative insights
@@ -311,30 +572,79 @@ class StartupKPIAgent:
                 HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
             }
         )
+        return _GEMINI_MODEL
+
+class StartupKPIAgent:
+    """
+    An agent that analyzes startup KPIs and provides actionable insights using SWOT analysis
+    powered by Google's Gemini 2.0 Flash API and web search for industry benchmarks.
+    """
+
+    def __init__(self, api_key=None, state_store=None):
+        """
+        Initialize the agent with the Google Gemini API.
+
+        Args:
+            api_key (str, optional): Google API key. If not provided, will look for
+                                     GOOGLE_API_KEY environment variable.
+            state_store (optional): Store for caches and the Gemini request quota. Defaults
+                                    to the backend named by KPI_STATE_BACKEND (see state_store.py).
+        """
+        # Validate the key now; the model client itself is built on first use
+        self._api_key = _resolve_api_key(api_key)
+
+        # Caches and quota live in the state store so workers can share them
+        self.state_store = state_store or create_state_store(counter_file=GEMINI_REQUEST_COUNT_FILE)
 
         # Initialize benchmark fetcher
-        self.benchmark_fetcher = IndustryBenchmarkFetcher()
-
-        # Initialize news and competitor cache
-        self.news_cache = {}
-        self.competitor_cache = {}
-        self.cache_timestamp = None
-
-    def _check_and_increment_gemini_request(self):
-        with GEMINI_REQUEST_LOCK:
-            data = _load_gemini_request_count()
-            if data["date"] != _get_today_str():
-                data = {"date": _get_today_str(), "count": 0}
-            if data["count"] >= GEMINI_DAILY_LIMIT:
-                return False
-            data["count"] += 1
-            _save_gemini_request_count(data)
-            return True
-
-    def _generate_content_with_limit(self, prompt):
-        if not self._check_and_increment_gemini_request():
-            raise Exception(f"Gemini API daily request limit ({GEMINI_DAILY_LIMIT}) reached. Please try again tomorrow.")
-        return self.model.generate_content(prompt)
+        self.benchmark_fetcher = IndustryBenchmarkFetcher(state_store=self.state_store)
+
+        # Articles from all feeds, shared by every industry and indexed by keyword
+        self.news_pool = ArticlePool(max_articles=NEWS_POOL_SIZE)
+        self._news_pool_refreshed_at = None
+        self._news_pool_retry_at = None
+
+        # Concurrent identical requests share one context fetch and one model call
+        self._context_flights = SingleFlight()
+        self._model_flights = SingleFlight()
+
+        # All model calls are admitted by the scheduler, which reserves quota per priority class
+        self.scheduler = GeminiScheduler(
+            self.state_store, GEMINI_DAILY_LIMIT,
+            max_concurrent=GEMINI_MAX_CONCURRENT, max_per_minute=GEMINI_MAX_PER_MINUTE
+        )
+
+        # Rules-based engine for previews and for when the Gemini quota runs out
+        self.local_engine = LocalInsightsEngine()
+
+    @property
+    def model(self):
+        """Shared Gemini model client, built on first use."""
+        return get_gemini_model(self._api_key)
+
+    def preload(self):
+        """
+        Import the heavy dependencies and build the model client up front.
+
+        Used in pre-fork deployments so the work is done once in the master process
+        instead of on each worker's first request.
+        """
+        for module in (genai, genai_types, requests, feedparser, bs4):
+            module.load()
+        return self.model
+
+    def _gemini_quota_exhausted(self, priority=Priority.INTERACTIVE):
+        return self.scheduler.remaining(priority) <= 0
+
+    def _generate_content_with_limit(self, prompt, priority=Priority.INTERACTIVE, timeout=None):
+        # Identical prompts in flight at the same time share one call (and one unit of quota).
+        # Only calls of the same priority are shared, so a live request never inherits a
+        # prefetch's quota slice or deadline.
+        prompt_key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return self._model_flights.do((priority, prompt_key), self._call_model, prompt, priority, timeout)
+
+    def _call_model(self, prompt, priority, timeout):
+        return self.scheduler.submit(lambda: self.model.generate_content(prompt), priority, timeout)
 
     def fetch_industry_news(self, industry: str, max_articles: int = 5) -> List[Dict[str, str]]:
         """
@@ -353,100 +663,123 @@ class StartupKPIAgent:
             List of news article dictionaries with 'title' and 'summary' keys
         """
         # Check if we have cached news that's less than 24 hours old
-        current_time = datetime.now()
-        if (self.cache_timestamp and
-                (current_time - self.cache_timestamp).total_seconds() < 86400 and
-                industry in self.news_cache):
-            return self.news_cache[industry][:max_articles]
-
-        # If no cache or cache expired, fetch new articles
-        news_articles = []
-
-        # List of RSS feeds for startup/tech news
-        # Including global and India-specific sources
-        rss_feeds = [
-            # Global sources
-            "https://feeds.feedburner.com/TechCrunch/",
-            "https://news.ycombinator.com/rss",
-            "https://www.techmeme.com/feed/",
-
-            # India-specific sources
-            "https://yourstory.com/feed/",  # YourStory RSS feed
-            "https://inc42.com/feed/",  # Inc42 RSS feed
-            "https://economictimes.indiatimes.com/small-biz/startups/rssfeeds/11993050.cms",  # ET StartupWorld
-
-            # Dynamic search query
-            f"https://news.google.com/rss/search?q={industry}+startup+india"  # India-focused search
-        ]
+        cached_news = self.get_cached_news(industry)
+        if cached_news is not None:
+            return cached_news[:max_articles]
 
-        try:
-            # Create a session with proper user agent for responsible access
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (compatible; StartupAnalyzer/0.1; Educational Project; +http://yourprojectwebsite.com/)',
-                'Accept': 'application/rss+xml'
-            })
+        return self._context_flights.do(
+            ("news", industry, max_articles), self._fetch_industry_news, industry, max_articles
+        )
 
-            # Counter to limit total requests across all feeds
-            total_requests = 0
-            max_requests = 10  # Reasonable limit
-
-            for feed_url in rss_feeds:
-                # Rate limiting for responsible access
-                if total_requests > 0:
-                    time.sleep(2)  # 2-second delay between different RSS feeds
-
-                total_requests += 1
-                if total_requests > max_requests:
-                    break
-
-                # Use feedparser to fetch and parse the RSS feed
-                feed = feedparser.parse(feed_url)
-
-                for entry in feed.entries[:5]:  # Limit to top 5 entries per feed
-                    # Check if article is relevant to the industry
-                    if (industry.lower() in entry.title.lower() or
-                            industry.lower() in getattr(entry, 'summary', '').lower()):
-
-                        # Extract text safely with BeautifulSoup if HTML content
-                        summary = entry.get('summary', '')
-                        if summary and ('<' in summary and '>' in summary):
-                            try:
-                                summary = BeautifulSoup(summary, "html.parser").get_text()
-                            except:
-                                # Fallback if parsing fails
-                                summary = summary[:200] + "..."
-
-                        news_articles.append({
-                            "title": entry.title,
-                            "summary": summary[:200] + "..." if len(summary) > 200 else summary,
-                            "date": entry.get('published', ''),
-                            "source": feed_url.split('/')[2]  # Extract domain as source
-                        })
+    def _fetch_industry_news(self, industry: str, max_articles: int) -> List[Dict[str, str]]:
+        """Look the industry up in the shared article pool and cache the result (uncached path of fetch_industry_news)."""
+        current_time = datetime.now()
 
-                    if len(news_articles) >= max_articles:
-                        break
+        try:
+            # Feeds shared by all industries are fetched into the pool once per NEWS_CACHE_TTL
+            self._refresh_news_pool()
+            articles = self.news_pool.query(industry, max_articles)
+            complete = True
 
-                if len(news_articles) >= max_articles:
-                    break
+            # Fall back to the industry-specific search feeds if the shared feeds fall short
+            if len(articles) < max_articles:
+                search_feeds = [feed.format(industry=industry) for feed in NEWS_FEEDS if "{industry}" in feed]
+                complete = not search_feeds or self._fetch_news_feeds(search_feeds) > 0
+                articles = self.news_pool.query(industry, max_articles)
 
         except Exception as e:
             print(f"Error fetching news: {e}")
             # Return some generic insights if news fetching fails
-            news_articles = [{
+            return [{
                 "title": "News fetching failed",
                 "summary": "Unable to retrieve current industry news. Working with existing knowledge.",
                 "date": current_time.strftime("%Y-%m-%d"),
                 "source": "system"
             }]
 
-        # Update cache
-        self.news_cache[industry] = news_articles
-        self.cache_timestamp = current_time
+        # Cache only the pool keys; the articles themselves live once in the pool. Empty or
+        # partial results from feeds that failed are not cached, so they are retried.
+        if articles and complete:
+            self.state_store.set("news", industry, [article.key for article in articles], ttl=NEWS_CACHE_TTL)
 
-        return news_articles[:max_articles]
+        return [article.to_dict() for article in articles]
 
-    def fetch_competitor_info(self, industry: str, product_type: str) -> List[Dict[str, str]]:
+    def get_cached_news(self, industry: str) -> Optional[List[Dict[str, str]]]:
+        """
+        Articles last found for an industry, without fetching anything.
+
+        Returns:
+            List of article dicts, or None if nothing is cached or the cached articles are
+            no longer in this process's pool
+        """
+        keys = self.state_store.get("news", industry)
+        if keys is None:
+            return None
+        articles = self.news_pool.get(keys)
+        if articles is None:
+            return None
+        return [article.to_dict() for article in articles]
+
+    def _refresh_news_pool(self):
+        """Fetch the shared (non-search) feeds into the article pool if they are stale."""
+        now = time.time()
+        if self._news_pool_refreshed_at and now - self._news_pool_refreshed_at < NEWS_CACHE_TTL:
+            return
+        if self._news_pool_retry_at and now < self._news_pool_retry_at:
+            return
+
+        def refresh():
+            shared_feeds = [feed for feed in NEWS_FEEDS if "{industry}" not in feed]
+            # feedparser does not raise on network errors, it returns no entries. Only count
+            # the refresh if some feed answered; otherwise try again after NEWS_RETRY_AFTER.
+            if not shared_feeds or self._fetch_news_feeds(shared_feeds) > 0:
+                self._news_pool_refreshed_at = time.time()
+            else:
+                self._news_pool_retry_at = time.time() + NEWS_RETRY_AFTER
+
+        # Requests for different industries all wait on one refresh
+        self._context_flights.do("news_pool", refresh)
+
+    def _fetch_news_feeds(self, feed_urls: List[str]) -> int:
+        """
+        Parse RSS feeds into the shared article pool (see the usage note on fetch_industry_news).
+
+        Args:
+            feed_urls (List[str]): Feeds to fetch
+
+        Returns:
+            int: Number of feeds that returned entries. feedparser reports network errors
+                 as an empty feed, so 0 means none of the feeds could be read.
+        """
+        feeds_read = 0
+
+        # Counter to limit total requests across all feeds
+        max_requests = 10  # Reasonable limit
+
+        for total_requests, feed_url in enumerate(feed_urls[:max_requests]):
+            # Rate limiting for responsible access
+            if total_requests > 0:
+                time.sleep(SCRAPE_DELAY)  # Delay between different RSS feeds
+
+            # Use feedparser to fetch and parse the RSS feed, with a proper user agent
+            feed = feedparser.parse(feed_url, agent=NEWS_USER_AGENT)
+            source = feed_url.split('/')[2]  # Extract domain as source
+
+            if feed.entries:
+                feeds_read += 1
+            for entry in feed.entries[:NEWS_ENTRIES_PER_FEED]:
+                self.news_pool.add(
+                    title=entry.get('title', ''),
+                    summary=entry.get('summary', ''),
+                    date=entry.get('published', ''),
+                    source=source,
+                    url=entry.get('link', '')
+                )
+
+        return feeds_read
+
+    def fetch_competitor_info(self, industry: str, product_type: str,
+                              priority: Priority = Priority.BATCH) -> List[Dict[str, str]]:
         """
         Fetch information about potential competitors in the industry.
         In a real implementation, this would use a more robust data source.
@@ -454,19 +787,27 @@ class StartupKPIAgent:
         Args:
             industry (str): The industry to search for competitors
             product_type (str): Type of product/service
+            priority (Priority): Scheduler priority of the model call. Defaults to BATCH so
+                                 competitor lookups cannot use up the quota reserved for
+                                 interactive SWOT analyses.
 
         Returns:
             List of competitor information dictionaries
         """
         cache_key = f"{industry}_{product_type}"
 
-        # Check if we have cached competitor info
-        current_time = datetime.now()
-        if (self.cache_timestamp and
-                (current_time - self.cache_timestamp).total_seconds() < 86400 * 7 and  # Cache for a week
-                cache_key in self.competitor_cache):
-            return self.competitor_cache[cache_key]
+        # Check if we have cached competitor info (cached for a week)
+        cached_competitors = self.state_store.get("competitors", cache_key)
+        if cached_competitors is not None:
+            return cached_competitors
 
+        return self._context_flights.do(
+            ("competitors", cache_key, priority), self._fetch_competitor_info, cache_key, industry, product_type, priority
+        )
+
+    def _fetch_competitor_info(self, cache_key: str, industry: str, product_type: str,
+                               priority: Priority) -> List[Dict[str, str]]:
+        """Generate competitor info with the model and cache it (uncached path of fetch_competitor_info)."""
         # In a real implementation, this would use a more robust API or database
         # This is a mock implementation that uses the Gemini model to generate competitor insights
         try:
@@ -493,7 +834,7 @@ class StartupKPIAgent:
             Only provide the JSON array with no other text or explanation.
             """
 
-            response = self._generate_content_with_limit(prompt)
+            response = self._generate_content_with_limit(prompt, priority, QUEUE_TIMEOUTS[priority])
 
             # Extract JSON from the response
             response_text = response.text
@@ -506,7 +847,7 @@ class StartupKPIAgent:
                 raise ValueError("Could not find valid JSON array in response")
 
             # Cache the results
-            self.competitor_cache[cache_key] = competitors
+            self.state_store.set("competitors", cache_key, competitors, ttl=COMPETITOR_CACHE_TTL)
             return competitors
 
         except Exception as e:
@@ -522,6 +863,30 @@ class StartupKPIAgent:
                 }
             ]
 
+    def prefetch_context(self, company_data: Dict[str, Any], kpi_names: List[str] = None) -> Dict[str, Any]:
+        """
+        Warm the news, competitor and benchmark caches for a company ahead of a live request.
+
+        Model calls run at PREFETCH priority, so they only use the quota reserved for
+        prefetching and never delay interactive requests.
+
+        Args:
+            company_data (Dict): Information about the company (name, industry, stage, etc.)
+            kpi_names (List[str], optional): KPIs to fetch benchmarks for
+
+        Returns:
+            Dict with the number of cached news articles, competitors and benchmarks
+        """
+        industry = company_data.get("industry", "Technology")
+        news = self.fetch_industry_news(industry)
+        competitors = self.fetch_competitor_info(industry, company_data.get("product", ""), Priority.PREFETCH)
+        benchmarks = {}
+        if kpi_names:
+            benchmarks = self.benchmark_fetcher.fetch_benchmarks_for_kpis(
+                industry, company_data.get("stage", "Early-stage"), kpi_names
+            )
+        return {"news": len(news), "competitors": len(competitors), "benchmarks": len(benchmarks)}
+
     def _prepare_kpi_analysis_with_benchmarks(self, company_data: Dict[str, Any], kpi_data: Dict[str, Any]) -> str:
         """
         Prepare KPI analysis by comparing with fetched industry benchmarks.
@@ -536,9 +901,9 @@ class StartupKPIAgent:
         industry = company_data.get("industry", "Technology")
         stage = company_data.get("stage", "Early-stage")
 
-        # Get benchmark data for each KPI
+        # Get benchmark data for each KPI; refreshes of cached ones don't hold up the request
         benchmark_data = self.benchmark_fetcher.fetch_benchmarks_for_kpis(
-            industry, stage, list(kpi_data.keys())
+            industry, stage, list(kpi_data.keys()), wait_for_refresh=False
         )
 
         analysis = []
@@ -554,33 +919,14 @@ class StartupKPIAgent:
 
                 if bench.get("value") is not None:
                     benchmark_value = bench["value"]
+                    if isinstance(value, (int, float)) and isinstance(benchmark_value, (int, float)):
+                        # Search results store "7%" as 0.07; KPI data records it as 7
+                        benchmark_value = benchmark_on_kpi_scale(kpi, value, bench)
 
-                    # Check whether lower or higher is better for this KPI
-                    if kpi in ["churn_rate", "burn_rate", "customer_churn_rate", "return_rate",
-                               "order_fulfillment_time", "logistics_cost_per_unit"]:
-                        # Lower is better for these metrics
-                        if value < benchmark_value:
-                            performance = "better than"
-                            comparison = "lower than"
-                        elif value > benchmark_value * 1.2:  # 20% worse
-                            performance = "significantly worse than"
-                            comparison = "higher than"
-                        else:
-                            performance = "close to"
-                            comparison = "similar to"
-                    else:
-                        # Higher is better for most other metrics
-                        if value > benchmark_value:
-                            performance = "better than"
-                            comparison = "higher than"
-                        elif value < benchmark_value * 0.8:  # 20% worse
-                            performance = "significantly worse than"
-                            comparison = "lower than"
-                        else:
-                            performance = "close to"
-                            comparison = "similar to"
-
-                    kpi_info += f" ({performance} industry benchmark of {benchmark_value}, {comparison} average)"
+                    # Lower is better for some metrics (churn, costs, cycle times), higher for the rest
+                    result = compare_to_benchmark(kpi, value, benchmark_value)
+
+                    kpi_info += f" ({result['performance']} industry benchmark of {benchmark_value}, {result['comparison']} average)"
 
                 elif bench.get("range") is not None:
                     kpi_info += f" (industry benchmark range: {bench['range']})"
@@ -595,6 +941,12 @@ class StartupKPIAgent:
 
                     # Store URL in benchmark data for later citation use
                     bench["source_url"] = source_url
+
+                # Let the model weigh thin or old benchmarks accordingly
+                if bench.get("confidence") is not None:
+                    kpi_info += (f" [benchmark confidence {bench['confidence']:.2f} from "
+                                 f"{bench.get('source_count', 0)} agreeing source(s), "
+                                 f"retrieved {bench.get('retrieved_at', 'unknown')[:10]}]")
             else:
                 kpi_info += " (no web benchmark data found)"
 
@@ -603,7 +955,35 @@ class StartupKPIAgent:
         return "\n".join(analysis)
 
 
-    def generate_startup_insights(self, company_data: Dict[str, Any], kpi_data: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_local_insights(self, company_data: Dict[str, Any], kpi_data: Dict[str, Any],
+                                kpi_series: Dict[str, List[Any]] = None) -> Dict[str, Any]:
+        """
+        Generate insights with the rules-based engine, using only cached context.
+
+        Makes no model call and no web request, so it returns in milliseconds.
+
+        Args:
+            company_data (Dict): Information about the company (name, industry, stage, etc.)
+            kpi_data (Dict): KPI metrics data
+            kpi_series (Dict, optional): KPI name -> list of values (oldest first) for trends
+
+        Returns:
+            Dict with insights in the same shape as generate_startup_insights
+        """
+        industry = company_data.get("industry", "Technology")
+        stage = company_data.get("stage", "Early-stage")
+        product_type = company_data.get("product", "")
+
+        return self.local_engine.generate(
+            company_data, kpi_data,
+            benchmark_data=self.benchmark_fetcher.get_cached_benchmarks(industry, stage, list(kpi_data.keys())),
+            kpi_series=kpi_series,
+            industry_news=self.get_cached_news(industry),
+            competitors=self.state_store.get("competitors", f"{industry}_{product_type}")
+        )
+
+    def generate_startup_insights(self, company_data: Dict[str, Any], kpi_data: Dict[str, Any],
+                                  mode: str = "full", kpi_series: Dict[str, List[Any]] = None) -> Dict[str, Any]:
         """
         Generate startup-focused insights with SWOT analysis based on KPIs, company information,
         industry news and competitor data.
@@ -611,10 +991,18 @@ class StartupKPIAgent:
         Args:
             company_data (Dict): Information about the company (name, industry, stage, etc.)
             kpi_data (Dict): KPI metrics data
+            mode (str): "full" for the Gemini analysis, or "preview" for the rules-based one.
+                        Full mode falls back to the rules-based analysis once the daily
+                        Gemini quota is exhausted.
+            kpi_series (Dict, optional): KPI name -> list of values (oldest first), used for
+                                         trends in the rules-based analysis
 
         Returns:
             Dict with generated insights including SWOT analysis and proper citations
         """
+        if mode == "preview" or self._gemini_quota_exhausted():
+            return self.generate_local_insights(company_data, kpi_data, kpi_series)
+
         # Get relevant industry news
         industry = company_data.get("industry", "Technology")
         industry_news = self.fetch_industry_news(industry)
@@ -714,7 +1102,7 @@ class StartupKPIAgent:
 
         # Generate insights
         try:
-            response = self._generate_content_with_limit(prompt)
+            response = self._generate_content_with_limit(prompt, Priority.INTERACTIVE, INTERACTIVE_QUEUE_TIMEOUT)
 
             # Parse the response as JSON
             try:
@@ -745,17 +1133,18 @@ class StartupKPIAgent:
                                 "source": source,
                                 "title": article.get("title", "Unknown"),
                                 "date": article.get("date", "Unknown"),
-                                "url": ""  # URL not available in our implementation
+                                "url": article.get("url", "")
                             })
                             existing_sources.add(source)
 
                     # Add benchmark sources to citations if not already there
+                    cached_benchmarks = self.benchmark_fetcher.get_cached_benchmarks(
+                        company_data.get("industry", "Technology"),
+                        company_data.get("stage", "Early-stage"),
+                        list(kpi_data.keys())
+                    )
                     for kpi, value in kpi_data.items():
-                        benchmark_data = self.benchmark_fetcher.fetch_benchmarks_for_kpis(
-                            company_data.get("industry", "Technology"),
-                            company_data.get("stage", "Early-stage"),
-                            [kpi]
-                        ).get(kpi, {})
+                        benchmark_data = cached_benchmarks.get(kpi, {})
 
                         source_title = benchmark_data.get("source_title")
                         if source_title and source_title not in existing_sources:
@@ -763,7 +1152,7 @@ class StartupKPIAgent:
                                 "id": f"benchmark_{len(insights['citations']) + 1}",
                                 "source": source_title,
                                 "title": f"Benchmark data for {kpi}",
-                                "date": "Retrieved " + datetime.now().strftime("%Y-%m-%d"),
+                                "date": "Retrieved " + benchmark_data.get("retrieved_at", datetime.now().isoformat())[:10],
                                 "url": benchmark_data.get("source_url", "")
                             })
                             existing_sources.add(source_title)
@@ -781,6 +1170,18 @@ class StartupKPIAgent:
                     "error": "JSON parsing failed"
                 }
 
+        except (GeminiQuotaExceeded, RequestShed) as e:
+            print(f"{e} Falling back to local insights.")
+            return self.local_engine.generate(
+                company_data, kpi_data,
+                benchmark_data=self.benchmark_fetcher.get_cached_benchmarks(
+                    industry, company_data.get("stage", "Early-stage"), list(kpi_data.keys())
+                ),
+                kpi_series=kpi_series,
+                industry_news=industry_news,
+                competitors=competitors
+            )
+
         except Exception as e:
             print(f"Error generating insights: {e}")
             return {
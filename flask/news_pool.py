@@ -0,0 +1,164 @@
+# Shared pool of news articles with a keyword index
+# Feeds are parsed once into compact article records shared by every industry. An inverted
+# index maps each word to the articles containing it, so finding the news for an industry
+# is an index lookup rather than a rescan of every feed.
+
+import re
+import html
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\w+')
+
+SUMMARY_LENGTH = 200
+
+
+def strip_html(text: str) -> str:
+    """Remove tags and entities from an HTML fragment without building a parse tree."""
+    if '<' in text and '>' in text:
+        text = _TAG_RE.sub(' ', text)
+    return _SPACE_RE.sub(' ', html.unescape(text)).strip()
+
+
+def tokenize(text: str) -> Set[str]:
+    """Lowercase word tokens of a text."""
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _title_fingerprint(title: str) -> str:
+    normalized = ' '.join(_WORD_RE.findall(title.lower()))
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class Article:
+    """Compact record of one news article."""
+
+    __slots__ = ("key", "seq", "title", "summary", "date", "source", "url")
+
+    def __init__(self, key: str, seq: int, title: str, summary: str, date: str, source: str, url: str):
+        self.key = key
+        self.seq = seq
+        self.title = title
+        self.summary = summary
+        self.date = date
+        self.source = source
+        self.url = url
+
+    def to_dict(self) -> Dict[str, str]:
+        """Article in the dict format used by the insights prompt and citations."""
+        return {
+            "title": self.title,
+            "summary": self.summary,
+            "date": self.date,
+            "source": self.source,
+            "url": self.url,
+        }
+
+
+class ArticlePool:
+    """
+    Bounded, deduplicated store of articles from all feeds with an inverted keyword index.
+
+    Articles are deduplicated by URL and by a hash of the normalized title, so the same
+    story syndicated to several feeds is kept once. When the pool is full the oldest
+    articles are evicted.
+    """
+
+    def __init__(self, max_articles: int = 1000):
+        """
+        Args:
+            max_articles (int): Maximum number of articles kept in memory
+        """
+        self.max_articles = max_articles
+        self._articles: "OrderedDict[str, Article]" = OrderedDict()
+        self._index: Dict[str, Set[str]] = {}
+        self._tokens: Dict[str, Tuple[str, ...]] = {}
+        self._urls: Dict[str, str] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._articles)
+
+    def add(self, title: str, summary: str = "", date: str = "", source: str = "", url: str = "") -> bool:
+        """
+        Add an article unless it is already in the pool.
+
+        Args:
+            title (str): Article title
+            summary (str): Summary, possibly containing HTML
+            date (str): Publication date as given by the feed
+            source (str): Source name (e.g. the feed's domain)
+            url (str): Article link
+
+        Returns:
+            bool: True if the article was added, False if it was a duplicate
+        """
+        key = _title_fingerprint(title)
+        with self._lock:
+            if key in self._articles or (url and url in self._urls):
+                return False
+
+            text = strip_html(summary)
+            # Index the full text, keep only the truncated summary
+            tokens = tokenize(title) | tokenize(text)
+            if len(text) > SUMMARY_LENGTH:
+                text = text[:SUMMARY_LENGTH] + "..."
+
+            self._seq += 1
+            self._articles[key] = Article(key, self._seq, title, text, date, source, url)
+            self._tokens[key] = tuple(tokens)
+            for token in tokens:
+                self._index.setdefault(token, set()).add(key)
+            if url:
+                self._urls[url] = key
+
+            while len(self._articles) > self.max_articles:
+                self._evict_oldest()
+            return True
+
+    def _evict_oldest(self):
+        key, article = self._articles.popitem(last=False)
+        for token in self._tokens.pop(key):
+            keys = self._index[token]
+            keys.discard(key)
+            if not keys:
+                del self._index[token]
+        if article.url:
+            self._urls.pop(article.url, None)
+
+    def query(self, keywords: str, limit: Optional[int] = None) -> List[Article]:
+        """
+        Articles mentioning every word of ``keywords`` in their title or summary, most
+        recently added first.
+
+        Args:
+            keywords (str): Search words, e.g. an industry name
+            limit (int, optional): Maximum number of articles to return
+        """
+        tokens = tokenize(keywords)
+        if not tokens:
+            return []
+        with self._lock:
+            # Intersect the smallest posting lists first
+            postings = sorted((self._index.get(token, set()) for token in tokens), key=len)
+            matches = set.intersection(*postings)
+            results = sorted((self._articles[key] for key in matches), key=lambda article: article.seq, reverse=True)
+        return results[:limit] if limit is not None else results
+
+    def get(self, keys: List[str]) -> Optional[List[Article]]:
+        """
+        Articles for previously returned keys, in the given order.
+
+        Returns:
+            List[Article], or None if any of them has been evicted (or was never in this
+            process's pool)
+        """
+        with self._lock:
+            if not all(key in self._articles for key in keys):
+                return None
+            return [self._articles[key] for key in keys]
@@ -0,0 +1,60 @@
+# Request coalescing for expensive calls
+# When several threads ask for the same thing at the same time (e.g. a dashboard opened
+# by a few people at once, or the Node backend retrying), only the first caller does the
+# work; the others wait on its future and receive the same result.
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    Coalescing is per process: gunicorn workers each have their own SingleFlight, and
+    rely on the shared state store to reuse results once the first call has finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call ``fn(*args, **kwargs)`` unless a call with the same key is already in flight,
+        in which case wait for that call and return its result (or raise its exception).
+
+        Args:
+            key (Hashable): Identifies calls that are interchangeable
+            fn (Callable): The function doing the actual work
+
+        Returns:
+            The result of the single shared call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        with self._lock:
+            return len(self._calls)
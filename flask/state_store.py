@@ -0,0 +1,230 @@
+# Shared state backends for the KPI agent
+# Holds the agent's caches and the Gemini request quota so that several worker
+# processes (e.g. gunicorn with preload_app) can share them instead of each
+# keeping a private copy.
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+def _get_today_str():
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+class LocalStateStore:
+    """
+    In-process state store. Cache entries live in a dict and daily counters are
+    persisted to a small JSON file, guarded by a thread lock.
+
+    Suitable for a single process (e.g. ``python flask_backend.py``). Counters are
+    not safe to share between processes; use SQLiteStateStore for that.
+    """
+
+    def __init__(self, counter_file: str):
+        """
+        Initialize the local store.
+
+        Args:
+            counter_file (str): Path of the JSON file used to persist daily counters
+        """
+        self.counter_file = counter_file
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value for (namespace, key), or None if missing or expired."""
+        with self._lock:
+            entry = self._cache.get((namespace, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._cache[(namespace, key)]
+                return None
+            return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, optionally expiring after ``ttl`` seconds."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._cache[(namespace, key)] = (value, expires_at)
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a cached value if present."""
+        with self._lock:
+            self._cache.pop((namespace, key), None)
+
+    def _load_counters(self) -> Dict[str, Any]:
+        today = _get_today_str()
+        if not os.path.exists(self.counter_file):
+            return {"date": today, "counters": {}}
+        try:
+            with open(self.counter_file, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return {"date": today, "counters": {}}
+        if data.get("date") != today:
+            return {"date": today, "counters": {}}
+        counters = data.get("counters", {})
+        # Older files only tracked the Gemini total as "count", or as a single "gemini"
+        # counter. Charge it to the interactive class so today's usage still counts.
+        legacy = counters.pop("gemini", data.get("count", 0))
+        if legacy and "gemini:interactive" not in counters:
+            counters["gemini:interactive"] = legacy
+        return {"date": today, "counters": counters}
+
+    def _save_counters(self, data: Dict[str, Any]) -> None:
+        with open(self.counter_file, 'w') as f:
+            json.dump(data, f)
+
+    def get_counter(self, name: str) -> int:
+        """Return today's value of a daily counter."""
+        with self._lock:
+            return self._load_counters()["counters"].get(name, 0)
+
+    def increment_counter(self, name: str, limit: int) -> bool:
+        """
+        Atomically increment today's value of a daily counter if it is below ``limit``.
+
+        Returns:
+            bool: True if the counter was incremented, False if the limit was reached
+        """
+        with self._lock:
+            data = self._load_counters()
+            count = data["counters"].get(name, 0)
+            if count >= limit:
+                return False
+            data["counters"][name] = count + 1
+            self._save_counters(data)
+            return True
+
+
+class SQLiteStateStore:
+    """
+    State store backed by a SQLite database file, shared by every process on the host.
+
+    Values are stored as JSON, so only JSON-serializable data can be cached. A separate
+    connection is opened per process (and per thread), which keeps the store safe to use
+    after a fork.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the SQLite store and create its tables if needed.
+
+        Args:
+            path (str): Path of the SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "name TEXT NOT NULL, day TEXT NOT NULL, count INTEGER NOT NULL, "
+                "PRIMARY KEY (name, day))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value for (namespace, key), or None if missing or expired."""
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(namespace, key)
+            return None
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, optionally expiring after ``ttl`` seconds."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._connect().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), expires_at)
+        )
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a cached value if present."""
+        self._connect().execute(
+            "DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+
+    def get_counter(self, name: str) -> int:
+        """Return today's value of a daily counter."""
+        row = self._connect().execute(
+            "SELECT count FROM counters WHERE name = ? AND day = ?", (name, _get_today_str())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def increment_counter(self, name: str, limit: int) -> bool:
+        """
+        Atomically increment today's value of a daily counter if it is below ``limit``.
+
+        The check and the increment run in one write transaction, so the limit holds
+        across all processes sharing the database.
+
+        Returns:
+            bool: True if the counter was incremented, False if the limit was reached
+        """
+        conn = self._connect()
+        day = _get_today_str()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT count FROM counters WHERE name = ? AND day = ?", (name, day)
+            ).fetchone()
+            count = row[0] if row else 0
+            if count >= limit:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO counters (name, day, count) VALUES (?, ?, ?)",
+                (name, day, count + 1)
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def create_state_store(backend: Optional[str] = None, counter_file: Optional[str] = None):
+    """
+    Create a state store from a backend spec.
+
+    Args:
+        backend (str, optional): ``"local"`` or ``"sqlite:///path/to/state.db"``. Defaults to
+                                 the KPI_STATE_BACKEND environment variable, then ``"local"``.
+        counter_file (str, optional): JSON counter file used by the local backend
+
+    Returns:
+        LocalStateStore or SQLiteStateStore
+    """
+    backend = backend or os.getenv("KPI_STATE_BACKEND", "local")
+    if backend == "local":
+        return LocalStateStore(counter_file or os.path.join(os.path.dirname(__file__), 'gemini_request_count.json'))
+    if backend.startswith("sqlite:///"):
+        return SQLiteStateStore(backend[len("sqlite:///"):])
+    raise ValueError(f"Unknown state backend: {backend}")